@@ -0,0 +1,100 @@
+"""
+Posting N jobs one at a time (an INSERT and a commit per job, as clients had to before
+POST /jobs/bulk) against JobService.create_jobs_bulk's multi-row INSERT ... RETURNING,
+in batches of BULK_JOB_MAX_ROWS. Runs against DATABASE_URL as a throwaway employer,
+which is deleted with its jobs at the end.
+
+    python -m benchmarks.bulk_insert --rows 1000 --rounds 3
+"""
+import time
+import asyncio
+import argparse
+from uuid import uuid4
+from sqlalchemy import delete
+from src.app import schemas
+from src.app.models import User, Job
+from src.app.services import job_service
+from src.db.main import async_engine, async_session_maker
+from src.config import Config
+
+
+def build_jobs(rows: int) -> list[schemas.JobCreate]:
+    return [
+        schemas.JobCreate(
+            title=f"Benchmark listing {index}",
+            description="Bulk insert benchmark listing. " * 20,
+            location="Lagos",
+            salary="100000",
+            is_active=True
+        )
+        for index in range(rows)
+    ]
+
+
+async def insert_per_job(jobs: list[schemas.JobCreate], employer_uid: str) -> None:
+    async with async_session_maker() as session:
+        for job in jobs:
+            await job_service.create_job(job, session, employer_uid)
+
+async def insert_bulk(jobs: list[schemas.JobCreate], employer_uid: str) -> None:
+    async with async_session_maker() as session:
+        for start in range(0, len(jobs), Config.BULK_JOB_MAX_ROWS):
+            await job_service.create_jobs_bulk(jobs[start:start + Config.BULK_JOB_MAX_ROWS], session, employer_uid)
+
+async def delete_jobs(employer_uid: str) -> None:
+    async with async_session_maker() as session:
+        await session.exec(delete(Job).where(Job.employer_uid == employer_uid))
+        await session.commit()
+
+
+async def main(args: argparse.Namespace) -> None:
+    suffix = uuid4().hex[:12]
+    employer = User(
+        username=f"bench_{suffix}",
+        email_address=f"bench_{suffix}@example.com",
+        first_name="Bulk",
+        last_name="Benchmark",
+        hashed_password="not-a-hash",
+        phone_number="08000000000",
+        gender="other",
+        is_verified=True,
+        role="employer"
+    )
+
+    async with async_session_maker() as session:
+        session.add(employer)
+        await session.commit()
+
+    employer_uid = str(employer.uid)
+    jobs = build_jobs(args.rows)
+    timings = {"per job": [], "bulk": []}
+
+    try:
+        for _ in range(args.rounds):
+            for name, insert in (("per job", insert_per_job), ("bulk", insert_bulk)):
+                start = time.perf_counter()
+                await insert(jobs, employer_uid)
+                timings[name].append(time.perf_counter() - start)
+
+                await delete_jobs(employer_uid)
+    finally:
+        async with async_session_maker() as session:
+            # the employer's jobs go with it (ON DELETE CASCADE)
+            await session.exec(delete(User).where(User.uid == employer.uid))
+            await session.commit()
+
+        await async_engine.dispose()
+
+    for name, samples in timings.items():
+        best = min(samples)
+        print(f"{name:<8} {args.rows} rows  best {best * 1000:9.1f} ms  {args.rows / best:9.0f} rows/s")
+
+    print(f"bulk is {min(timings['per job']) / min(timings['bulk']):.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-job inserts against the bulk job insert")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
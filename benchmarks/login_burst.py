@@ -0,0 +1,87 @@
+"""
+A burst of concurrent logins against bcrypt. Each password check runs either on the
+event loop (how login verified passwords before PasswordHasher) or through
+PasswordHasher's bounded thread pool. Meanwhile a heartbeat task measures how late
+the loop wakes it, i.e. how long every other request on the worker would stall.
+
+    python -m benchmarks.login_burst --logins 200 --workers 4 --queue 64
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from src.app import errors
+from src.app.auth.utils import PasswordHasher, hash_password, verify_password
+
+
+HEARTBEAT_INTERVAL = 0.005
+PASSWORD = "correct horse battery staple"
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+async def verify_on_loop(password: str, hashed_password: str) -> bool:
+    return verify_password(password, hashed_password)
+
+
+async def burst(name: str, verify, logins: int, hashed_password: str) -> None:
+    lags = []
+    latencies = []
+    rejected = 0
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+
+    async def login() -> None:
+        nonlocal rejected
+        start = time.perf_counter()
+
+        try:
+            assert await verify(PASSWORD, hashed_password)
+        except errors.ServerBusy:
+            rejected += 1
+            return
+
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.sleep(HEARTBEAT_INTERVAL * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+    print(
+        f"{name:<10} {len(latencies):>5} ok {rejected:>5} rejected  {elapsed:7.2f} s  {len(latencies) / elapsed:7.1f} logins/s  "
+        f"p50 {percentiles[49] * 1000:8.1f} ms  p95 {percentiles[94] * 1000:8.1f} ms  "
+        f"loop lag max {max(lags, default=0) * 1000:8.1f} ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    hashed_password = hash_password(PASSWORD)
+    hasher = PasswordHasher(max_workers=args.workers, max_queue=args.queue)
+
+    try:
+        await burst("on loop", verify_on_loop, args.logins, hashed_password)
+        await burst("hasher", hasher.verify, args.logins, hashed_password)
+    finally:
+        hasher.shutdown()
+
+    print(f"hasher stats: {hasher.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent logins checked on the event loop and through PasswordHasher")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--queue", type=int, default=64, help="PASSWORD_HASH_QUEUE")
+
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Mail throughput against a local aiosmtpd server, which can add a per-message delay to
+stand in for a remote relay's round trips. Three ways of sending N messages:
+
+- per message: connect, send and quit for every email (the old send_email)
+- engine single: MailDeliveryEngine.send one message at a time, which is all a
+  prefork Celery child does with send_email
+- engine bulk: MailDeliveryEngine.send_many, i.e. send_bulk_email over the pool
+
+    python -m benchmarks.smtp_throughput --messages 500 --server-delay 5 --pool-size 2
+"""
+import os
+
+# a plain local server: no TLS, no login
+os.environ.update({
+    "MAIL_SERVER": "127.0.0.1",
+    "MAIL_PORT": os.environ.get("BENCHMARK_SMTP_PORT", "8025"),
+    "MAIL_STARTTLS": "false",
+    "MAIL_SSL_TLS": "false",
+    "USE_CREDENTIALS": "false"
+})
+
+import time
+import asyncio
+import argparse
+import aiosmtplib
+from aiosmtpd.controller import Controller
+from src.app.mail_delivery import MailDeliveryEngine, build_message
+from src.config import Config
+
+
+class DelayedSink:
+    """Accepts and drops every message after delay seconds"""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        await asyncio.sleep(self.delay)
+        self.received += 1
+
+        return "250 Message accepted for delivery"
+
+
+def build_messages(count: int) -> list:
+    return [build_message([f"user{index}@example.com"], f"Benchmark {index}", "<p>Benchmark message</p>") for index in range(count)]
+
+
+async def send_per_message(messages: list) -> None:
+    for message in messages:
+        await aiosmtplib.send(message, hostname=Config.MAIL_SERVER, port=Config.MAIL_PORT, timeout=Config.MAIL_TIMEOUT)
+
+
+def report(name: str, count: int, elapsed: float, connects: int) -> None:
+    print(f"{name:<14} {count} messages  {elapsed:8.2f} s  {count / elapsed:8.1f} msg/s  {connects:>5} connections")
+
+
+def main(args: argparse.Namespace) -> None:
+    sink = DelayedSink(args.server_delay / 1000)
+    controller = Controller(sink, hostname=Config.MAIL_SERVER, port=Config.MAIL_PORT)
+    controller.start()
+
+    messages = build_messages(args.messages)
+
+    try:
+        start = time.perf_counter()
+        asyncio.run(send_per_message(messages))
+        report("per message", len(messages), time.perf_counter() - start, len(messages))
+
+        engine = MailDeliveryEngine(pool_size=args.pool_size, batch_size=args.batch_size, max_retries=0, retry_backoff=0)
+
+        try:
+            start = time.perf_counter()
+            for message in messages:
+                engine.send(message)
+            report("engine single", len(messages), time.perf_counter() - start, engine.connects)
+
+            connects = engine.connects
+            start = time.perf_counter()
+            results = engine.send_many(messages)
+            report("engine bulk", len(messages), time.perf_counter() - start, engine.connects - connects)
+
+            failed = sum(error is not None for error in results)
+
+            if failed:
+                print(f"{failed} bulk messages failed")
+        finally:
+            engine.stop()
+    finally:
+        controller.stop()
+
+    print(f"server received {sink.received} messages")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SMTP delivery throughput against a local aiosmtpd server")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--server-delay", type=float, default=5, help="milliseconds the server takes per message")
+    parser.add_argument("--pool-size", type=int, default=Config.MAIL_POOL_SIZE)
+    parser.add_argument("--batch-size", type=int, default=Config.MAIL_BATCH_SIZE)
+
+    main(parser.parse_args())
\ No newline at end of file
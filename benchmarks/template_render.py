@@ -0,0 +1,89 @@
+"""
+Rendering the email templates N times:
+
+- compile per render: a fresh Environment for every email, so each render parses and
+  compiles the template and its base layout again
+- auto_reload: one shared Environment with Jinja2's default auto_reload, which stats
+  the template files on every get_template
+- precompiled: EmailTemplates.render, as the worker does
+- batch: EmailTemplates.render_batch over a mixed batch, as send_bulk_email does
+
+    python -m benchmarks.template_render --renders 10000
+"""
+import time
+import argparse
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+from src.app.email_templates import EmailTemplates, TEMPLATE_DIR
+
+
+SAMPLES = [
+    ("verify_email", {"first_name": "Ada", "link": "https://jobberman.example/api/v1.0/auth/verify_email/token"}),
+    ("password_reset", {"link": "https://jobberman.example/api/v1.0/auth/password_reset_confirm/token"}),
+    ("notification", {
+        "title": "New jobs for you",
+        "name": "Ada",
+        "message": "These listings match your saved search.",
+        "items": [{"text": f"Backend engineer {index}", "link": f"https://jobberman.example/jobs/{index}"} for index in range(5)],
+        "action_link": "https://jobberman.example/jobs"
+    })
+]
+
+
+def build_environment(auto_reload: bool) -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        undefined=StrictUndefined,
+        auto_reload=auto_reload
+    )
+
+
+def render_compiling(renders: int) -> None:
+    for index in range(renders):
+        name, context = SAMPLES[index % len(SAMPLES)]
+        build_environment(auto_reload=True).get_template(f"{name}.html").render(context)
+
+def render_auto_reload(renders: int) -> None:
+    environment = build_environment(auto_reload=True)
+
+    for index in range(renders):
+        name, context = SAMPLES[index % len(SAMPLES)]
+        environment.get_template(f"{name}.html").render(context)
+
+def render_precompiled(renders: int) -> None:
+    templates = EmailTemplates(TEMPLATE_DIR)
+    templates.load()
+
+    for index in range(renders):
+        name, context = SAMPLES[index % len(SAMPLES)]
+        templates.render(name, context)
+
+def render_batched(renders: int) -> None:
+    templates = EmailTemplates(TEMPLATE_DIR)
+    templates.load()
+
+    templates.render_batch([{"template": name, "context": context} for name, context in (SAMPLES[index % len(SAMPLES)] for index in range(renders))])
+
+
+def main(args: argparse.Namespace) -> None:
+    runs = [
+        # compiling is orders of magnitude slower; a slice of the renders is enough to time it
+        ("compile per render", render_compiling, max(1, args.renders // 100)),
+        ("auto_reload", render_auto_reload, args.renders),
+        ("precompiled", render_precompiled, args.renders),
+        ("batch", render_batched, args.renders)
+    ]
+
+    for name, render, renders in runs:
+        start = time.perf_counter()
+        render(renders)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:<20} {renders:>7} renders  {elapsed:8.3f} s  {elapsed / renders * 1e6:9.1f} us/render  {renders / elapsed:10.0f} renders/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Email template rendering with and without precompiled templates")
+    parser.add_argument("--renders", type=int, default=10000)
+
+    main(parser.parse_args())
\ No newline at end of file
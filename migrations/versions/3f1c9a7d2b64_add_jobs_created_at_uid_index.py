@@ -0,0 +1,30 @@
+"""add jobs created_at uid index
+
+Revision ID: 3f1c9a7d2b64
+Revises: a8373526c47d
+Create Date: 2026-10-17 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, None] = 'a8373526c47d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keyset pagination on GET /jobs seeks on (created_at, uid) newest first
+    op.create_index('ix_jobs_created_at_uid', 'jobs', ['created_at', 'uid'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_created_at_uid', table_name='jobs', if_exists=True)
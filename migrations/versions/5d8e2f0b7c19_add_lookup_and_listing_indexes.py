@@ -0,0 +1,46 @@
+"""add lookup and listing indexes
+
+Revision ID: 5d8e2f0b7c19
+Revises: 9b2e4d8c1a37
+Create Date: 2026-10-18 08:27:51.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e2f0b7c19'
+down_revision: Union[str, None] = '9b2e4d8c1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, unique) -- trailing created_at, uid match the keyset pagination order
+INDEXES = [
+    ('ix_jobs_employer_uid_created_at', 'jobs', ['employer_uid', 'created_at', 'uid'], False),
+    ('ix_applications_job_uid_created_at', 'applications', ['job_uid', 'created_at', 'uid'], False),
+    ('ix_applications_user_uid_created_at', 'applications', ['user_uid', 'created_at', 'uid'], False),
+    ('ix_applications_created_at_uid', 'applications', ['created_at', 'uid'], False),
+    ('ix_users_created_at_uid', 'users', ['created_at', 'uid'], False),
+    # email lookups are case-insensitive; this fails if two accounts differ only by case
+    ('uq_users_email_address_lower', 'users', [sa.text('lower(email_address)')], True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
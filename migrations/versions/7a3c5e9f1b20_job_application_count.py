@@ -0,0 +1,65 @@
+"""job application count
+
+Revision ID: 7a3c5e9f1b20
+Revises: e81b06c3a4d9
+Create Date: 2026-10-18 13:08:41.507316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c5e9f1b20'
+down_revision: Union[str, None] = 'e81b06c3a4d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# maintained by the database so inserts, deletes and ON DELETE CASCADE from users
+# all keep the counter in step, in the same transaction as the application row
+COUNT_FUNCTION = """
+CREATE OR REPLACE FUNCTION jobs_application_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.job_uid = NEW.job_uid THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE jobs SET application_count = application_count - 1 WHERE uid = OLD.job_uid;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE jobs SET application_count = application_count + 1 WHERE uid = NEW.job_uid;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+COUNT_TRIGGER = """
+CREATE TRIGGER applications_count_jobs
+AFTER INSERT OR DELETE OR UPDATE OF job_uid ON applications
+FOR EACH ROW
+EXECUTE FUNCTION jobs_application_count()
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('application_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE jobs SET application_count = counts.total "
+        "FROM (SELECT job_uid, count(*) AS total FROM applications GROUP BY job_uid) AS counts "
+        "WHERE jobs.uid = counts.job_uid"
+    )
+    op.execute(COUNT_FUNCTION)
+    op.execute(COUNT_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS applications_count_jobs ON applications')
+    op.execute('DROP FUNCTION IF EXISTS jobs_application_count()')
+    op.drop_column('jobs', 'application_count')
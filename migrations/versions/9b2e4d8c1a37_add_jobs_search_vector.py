@@ -0,0 +1,40 @@
+"""add jobs search vector
+
+Revision ID: 9b2e4d8c1a37
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-17 10:41:27.503119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e4d8c1a37'
+down_revision: Union[str, None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres keeps the generated column in sync on every insert/update of title or description
+    op.execute(
+        """
+        ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.create_index('ix_jobs_search_vector', 'jobs', ['search_vector'], postgresql_using='gin', if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_search_vector', table_name='jobs', if_exists=True)
+    op.drop_column('jobs', 'search_vector')
@@ -10,6 +10,7 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 import sqlmodel
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -21,13 +22,53 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Databases that were created by the old init_db create_all already have these
+    # tables; run `alembic stamp a8373526c47d` on them before upgrading.
+    op.create_table(
+        'users',
+        sa.Column('uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('username', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('email_address', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('first_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('last_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('hashed_password', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('phone_number', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('gender', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('role', postgresql.VARCHAR(), server_default='user', nullable=False),
+        sa.Column('created_at', postgresql.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('uid', name='users_pkey')
+    )
+    op.create_table(
+        'jobs',
+        sa.Column('uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('location', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('salary', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('employer_uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['employer_uid'], ['users.uid'], name='jobs_employer_uid_fkey'),
+        sa.PrimaryKeyConstraint('uid', name='jobs_pkey')
+    )
+    op.create_table(
+        'applications',
+        sa.Column('uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('job_uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('cover_letter', sa.Text(), nullable=False),
+        sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['job_uid'], ['jobs.uid'], name='applications_job_uid_fkey'),
+        sa.ForeignKeyConstraint(['user_uid'], ['users.uid'], name='applications_user_uid_fkey'),
+        sa.PrimaryKeyConstraint('uid', name='applications_pkey'),
+        sa.UniqueConstraint('job_uid', 'user_uid', name='uq_job_seeker')
+    )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_table('applications')
+    op.drop_table('jobs')
+    op.drop_table('users')
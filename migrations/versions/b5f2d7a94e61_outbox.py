@@ -0,0 +1,40 @@
+"""outbox
+
+Revision ID: b5f2d7a94e61
+Revises: 7a3c5e9f1b20
+Create Date: 2026-10-18 14:21:55.902143
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f2d7a94e61'
+down_revision: Union[str, None] = '7a3c5e9f1b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rows are deleted by the relay once published, so the table stays small
+    op.create_table(
+        'outbox',
+        sa.Column('uid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task', postgresql.VARCHAR(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('uid', name='outbox_pkey')
+    )
+    op.create_index('ix_outbox_created_at', 'outbox', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_created_at', table_name='outbox')
+    op.drop_table('outbox')
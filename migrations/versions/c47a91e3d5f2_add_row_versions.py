@@ -0,0 +1,32 @@
+"""add row versions
+
+Revision ID: c47a91e3d5f2
+Revises: 5d8e2f0b7c19
+Create Date: 2026-10-18 10:03:12.554870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a91e3d5f2'
+down_revision: Union[str, None] = '5d8e2f0b7c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # optimistic concurrency: every update bumps version and may require it to match If-Match
+    for table in ('users', 'jobs', 'applications'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('applications', 'jobs', 'users'):
+        op.drop_column(table, 'version')
@@ -0,0 +1,42 @@
+"""cascade deletes
+
+Revision ID: e81b06c3a4d9
+Revises: c47a91e3d5f2
+Create Date: 2026-10-18 11:46:30.218764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b06c3a4d9'
+down_revision: Union[str, None] = 'c47a91e3d5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (constraint, table, column, referred table) -- deletes are single statements now,
+# so dependent rows are removed by Postgres instead of being loaded by the ORM
+FOREIGN_KEYS = [
+    ('jobs_employer_uid_fkey', 'jobs', 'employer_uid', 'users'),
+    ('applications_job_uid_fkey', 'applications', 'job_uid', 'jobs'),
+    ('applications_user_uid_fkey', 'applications', 'user_uid', 'users'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['uid'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['uid'])
@@ -1,19 +1,39 @@
+import asyncio
 from fastapi import FastAPI, status
-from contextlib import asynccontextmanager
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager, suppress
+from fastapi.responses import JSONResponse, PlainTextResponse
 from src.app.auth import auth
 from src.app.errors import register_all_errors
-from src.db.main import init_db
+from src.db.main import init_db, async_engine, pool_stats, replicas
+from src.db.redis import sync_revoked_tokens, job_cache_stats, revoked_tokens, authz_versions
 from src.app.router import users, jobs, application
 from src.app.middlewares import register_all_middlewares
+from src.app.auth.utils import password_hasher, verified_tokens
+from src.app.metrics import registry, MetricFamily, CONTENT_TYPE
+from src.app.access_log import access_log_listener
 
 
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print(f"sever is starting ..........")
+    access_log_listener.start()
     await init_db()
+    revoked_tokens_sync = asyncio.create_task(sync_revoked_tokens())
+    replica_monitor = asyncio.create_task(replicas.monitor()) if replicas.engines else None
     yield
     print(f"sever is shutting down ..........")
+    revoked_tokens_sync.cancel()
+    with suppress(asyncio.CancelledError):
+        await revoked_tokens_sync
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+        with suppress(asyncio.CancelledError):
+            await replica_monitor
+    password_hasher.shutdown()
+    await replicas.dispose()
+    await async_engine.dispose()
+    # flushes whatever access log entries are still queued
+    access_log_listener.stop()
     print(f"sever has been stopped")
 
 version = "v1.0"
@@ -38,3 +58,47 @@ app.include_router(application.apps_router, prefix=f'/api/{version}')
 @app.get('/')
 async def root():
     return {"message": "Jobberman API"}
+
+
+def collect_app_stats():
+    """Pool, cache and hasher stats, read when /metrics is scraped rather than on every request"""
+    engines = [("primary", async_engine)] + [(f"replica{index}", engine) for index, engine in enumerate(replicas.engines)]
+    pools = [({"pool": name}, pool_stats(engine)) for name, engine in engines]
+    hasher = password_hasher.stats()
+
+    return [
+        MetricFamily("db_pool_size", "gauge", "Configured connections per pool", [(labels, stats["size"]) for labels, stats in pools]),
+        MetricFamily("db_pool_checked_out", "gauge", "Connections in use", [(labels, stats["checked_out"]) for labels, stats in pools]),
+        MetricFamily("db_pool_overflow", "gauge", "Connections opened beyond pool_size", [(labels, stats["overflow"]) for labels, stats in pools]),
+        MetricFamily("db_pool_waits_total", "counter", "Connection checkouts", [(labels, stats["wait_count"]) for labels, stats in pools]),
+        MetricFamily("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection", [(labels, stats["wait_time_total_seconds"]) for labels, stats in pools]),
+        MetricFamily("db_pool_wait_seconds_max", "gauge", "Longest wait for a connection", [(labels, stats["wait_time_max_seconds"]) for labels, stats in pools]),
+        MetricFamily("db_replica_healthy", "gauge", "Whether a replica passed its last health check", [({"pool": name}, engine in replicas.healthy) for name, engine in engines[1:]]),
+        MetricFamily("job_cache_requests_total", "counter", "Job detail cache lookups", [({"result": result}, count) for result, count in job_cache_stats.items()]),
+        MetricFamily("token_cache_requests_total", "counter", "Verified token cache lookups", [({"result": "hit"}, verified_tokens.hits), ({"result": "miss"}, verified_tokens.misses)]),
+        MetricFamily("token_cache_entries", "gauge", "Tokens held in the verified token cache", [({}, len(verified_tokens))]),
+        MetricFamily("authz_version_cache_requests_total", "counter", "Authz version lookups answered from memory or Redis", [({"result": "hit"}, authz_versions.hits), ({"result": "miss"}, authz_versions.misses)]),
+        MetricFamily("revoked_token_checks_total", "counter", "Blocklist checks by where they were answered", [({"source": "filter"}, revoked_tokens.local_answers), ({"source": "redis"}, revoked_tokens.redis_lookups)]),
+        MetricFamily("password_hash_in_flight", "gauge", "bcrypt calls running or queued", [({}, hasher["in_flight"])]),
+        MetricFamily("password_hash_completed_total", "counter", "bcrypt calls completed", [({}, hasher["completed"])]),
+        MetricFamily("password_hash_rejected_total", "counter", "bcrypt calls rejected with 503", [({}, hasher["rejected"])]),
+        MetricFamily("password_hash_queue_wait_seconds_total", "counter", "Time bcrypt calls spent queued", [({}, hasher["queue_wait_total_seconds"])])
+    ]
+
+registry.add_collector(collect_app_stats)
+
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get('/health/db')
+async def database_pool_stats():
+    return {
+        "pool": pool_stats(),
+        "replicas": [
+            {"url": str(engine.url), "healthy": engine in replicas.healthy, "pool": pool_stats(engine)}
+            for engine in replicas.engines
+        ]
+    }
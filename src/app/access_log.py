@@ -0,0 +1,71 @@
+import sys
+import json
+import queue
+import logging
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from src.config import Config
+
+
+REQUEST_ID_HEADER = "X-Request-ID"
+MAX_REQUEST_ID_LENGTH = 128
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: the record's access fields plus timestamp and level"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            **getattr(record, "access", {"message": record.getMessage()})
+        }
+
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler.prepare() formats the record in the caller's thread; the records here
+    only carry a dict, so they are queued as is and serialized by the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def build_access_logger() -> tuple[logging.Logger, QueueListener]:
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger("jobberman.access")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [DeferredQueueHandler(log_queue)]
+
+    return logger, QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+access_logger, access_log_listener = build_access_logger()
+
+
+def should_log(status_code: int, duration_ms: float, sample: float) -> bool:
+    """Errors and slow requests are always logged; the rest at ACCESS_LOG_SAMPLE_RATE"""
+    if status_code >= 400 or duration_ms >= Config.ACCESS_LOG_SLOW_MS:
+        return True
+
+    return sample < Config.ACCESS_LOG_SAMPLE_RATE
+
+def log_request(entry: dict) -> None:
+    if entry["status"] >= 500:
+        level = logging.ERROR
+    elif entry["status"] >= 400 or entry["duration_ms"] >= Config.ACCESS_LOG_SLOW_MS:
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+
+    access_logger.log(level, "request", extra={"access": entry})
\ No newline at end of file
@@ -4,16 +4,16 @@ from datetime import timedelta
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta, timezone
 from src.db.main import get_session
-from src.app.auth.utils import verify_password, create_access_token, create_url_safe_token, decode_url_safe_token, hash_password
+from src.app.auth.utils import create_access_token, create_url_safe_token, decode_url_safe_token, password_hasher
 from src.app import schemas, errors
-from src.app.services import user_service
+from src.app.services import user_service, outbox_service
 from src.app.auth.dependencies import refresh_token_bearer, access_token_bearer
-from src.db.redis import add_token_to_blocklist
+from src.db.redis import add_token_to_blocklist, get_authz_version
 from src.app.auth.dependencies import get_current_user, RoleChecker
 import logging
-from src.app.mail import mail, create_message
 from src.config import Config
 from src.celery_tasks import send_email as celery_worker
+from src.app.metrics import celery_publish_duration_seconds
 
 
 auth_router = APIRouter(
@@ -35,7 +35,8 @@ async def send_email(emails: schemas.EmailModel):
 
     email_list = [emails]
 
-    celery_worker.delay(email_list, subject, html)
+    with celery_publish_duration_seconds.time(celery_worker.name):
+        celery_worker.delay(email_list, subject, html)
 
     return {"message": "email sent successfully!"}
 
@@ -54,21 +55,18 @@ async def signup(user_data: schemas.UserCreate, bg_tasks: BackgroundTasks, sessi
     if existing_user:
         raise errors.UserAlreadyExists()
 
-    new_user = await user_service.create_user(user_data, session)
-
     token = create_url_safe_token({"email": email})
 
     link = f"http://{Config.DOMAIN}/api/v1.0/auth/verify_email/{token}"
 
-    html_message =f"""
-    <h1>Verify your Email Address</h1>
-    <p>Please click on the <a href="{link}">link</a> to veify your account</p>
-    """
     emails = [email]
 
     subject = "Verify your email"
 
-    celery_worker.delay(emails, subject, html_message)
+    # staged in the session, so create_user's commit writes the user and the email together
+    outbox_service.add_email(session, emails, subject, "verify_email", {"first_name": user_data.first_name, "link": link})
+
+    new_user = await user_service.create_user(user_data, session)
 
     return {
         "message": "Account has been created successfuly! Please check your email to verify your account.",
@@ -105,6 +103,23 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
     )
 
 
+async def build_user_claims(user) -> dict:
+    """Role and verification claims as they stand now, stamped with the user's current authz_version"""
+    user_claims = {
+        'email': user.email_address,
+        'user_uid': str(user.uid),
+        'role': user.role,
+        'is_verified': bool(user.is_verified)
+    }
+
+    authz_version = await get_authz_version(str(user.uid))
+
+    if authz_version is not None:
+        user_claims['authz_version'] = authz_version
+
+    return user_claims
+
+
 @auth_router.post('/login', status_code=status.HTTP_202_ACCEPTED)
 async def login(login_data: schemas.LoginData, session: AsyncSession = Depends(get_session)):
 
@@ -115,22 +130,17 @@ async def login(login_data: schemas.LoginData, session: AsyncSession = Depends(g
 
     if user is not None:
 
-        validate_password = verify_password(password, user.hashed_password)
+        validate_password = await password_hasher.verify(password, user.hashed_password)
 
         if validate_password:
+            user_claims = await build_user_claims(user)
+
             access_token = create_access_token(
-                user_data={
-                    'email': user.email_address,
-                    'user_uid': str(user.uid),
-                    'role': user.role
-                }
+                user_data=user_claims
             )
 
             refresh_token = create_access_token(
-                user_data={
-                    'email': user.email_address,
-                    'user_uid': str(user.uid)
-                },
+                user_data=user_claims,
                 refresh=True,
                 expiry=timedelta(days=REFRESH_EXPIRY)
             )
@@ -151,13 +161,19 @@ async def login(login_data: schemas.LoginData, session: AsyncSession = Depends(g
 
 
 @auth_router.get('/refresh_token', status_code=status.HTTP_200_OK)
-async def get_new_access_token(token_details: dict = Depends(refresh_token_bearer)):
+async def get_new_access_token(token_details: dict = Depends(refresh_token_bearer), session: AsyncSession = Depends(get_session)):
 
     expiry_time = token_details['exp']
 
     if datetime.fromtimestamp(expiry_time, tz=timezone.utc) > datetime.now(timezone.utc):
+        # the refresh token's claims may predate a role change or verification, so reload them
+        user = await user_service.get_user_by_email(token_details['user']['email'], session)
+
+        if user is None or str(user.uid) != token_details['user']['user_uid']:
+            raise errors.InvalidToken()
+
         new_access_token = create_access_token(
-            user_data=token_details['user']
+            user_data=await build_user_claims(user)
         )
         return JSONResponse(
             content={
@@ -178,7 +194,7 @@ async def logout(token_details: dict = Depends(access_token_bearer)):
 
     jti = token_details['jti']
 
-    await add_token_to_blocklist(jti)
+    await add_token_to_blocklist(jti, token_details['exp'])
 
     return JSONResponse(
         content="Logged out successfully!",
@@ -187,26 +203,21 @@ async def logout(token_details: dict = Depends(access_token_bearer)):
 
 
 @auth_router.post('/password-reset-request')
-async def password_reset_request(email_data: schemas.PasswordResetRequest):
+async def password_reset_request(email_data: schemas.PasswordResetRequest, session: AsyncSession = Depends(get_session)):
     
     email = email_data.email_address
 
-    token = create_url_safe_token({"email": email})
+    user = await user_service.get_user_by_email(email, session)
 
-    link = f"http://{Config.DOMAIN}/api/v1.0/auth/confirm-password-reset/{token}"
+    # the response is the same either way, so it does not reveal which addresses have accounts
+    if user is not None:
+        token = create_url_safe_token({"email": email})
 
-    html_message =f"""
-    <h1>Reset your Password</h1>
-    <p>Please click on the <a href="{link}">link</a> to reset your password</p>
-    """
-    
-    message = create_message(
-        recipients=[email],
-        subject="Password reset",
-        body=html_message
-    )
+        link = f"http://{Config.DOMAIN}/api/v1.0/auth/confirm-password-reset/{token}"
+
+        outbox_service.add_email(session, [user.email_address], "Password reset", "password_reset", {"link": link})
 
-    mail.send_message(message)
+        await session.commit()
 
     return JSONResponse(
         content={"message": "Please check your email for instructions to reset your password."},
@@ -238,7 +249,7 @@ async def confirm_password_reset(passwd_data: schemas.ConfirmPasswordReset, toke
         if not user:
             raise errors.UserNotFound()
         
-        hashed_password = hash_password(new_password)
+        hashed_password = await password_hasher.hash(new_password)
         
         await user_service.update_user_info(user, {"hashed_password": hashed_password}, session)
 
@@ -1,34 +1,50 @@
 from fastapi import Request, status, HTTPException, Depends
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from fastapi.security import HTTPBearer
-from fastapi.security.http import HTTPAuthorizationCredentials
 from typing import Any, List
-from src.app.auth.utils import verify_access_token
-from src.db.redis import token_in_blocklist
+from src.app.auth.utils import verify_access_token, verified_tokens
+from src.db.redis import token_in_blocklist, get_authz_version
 from src.db.main import get_session
 from src.app.services import user_service
 from src.app import errors
-from src.app.models import User
+from src.config import Config
 
 class AccessPass(HTTPBearer):
     def __init__(self, auto_error = True):
         super().__init__(auto_error=auto_error)
     
-    async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
-        creds = await super().__call__(request)
+    async def __call__(self, request: Request) -> dict | None:
+        # every bearer and dependency on this request shares one decoded token
+        token_data = getattr(request.state, "token_data", None)
 
-        token = creds.credentials
+        if token_data is None:
+            creds = await super().__call__(request)
 
-        token_data = verify_access_token(token)
+            if creds is None:
+                return None
 
-        if not self.is_token_valid(token):
-            raise errors.InvalidToken()
+            token_data = await self.decode_token(creds.credentials)
+            request.state.token_data = token_data
+        
+        self.verify_token_data(token_data)
+        
+        return token_data
     
-        jti = token_data.get('jti')
-        if jti is None:
-            raise errors.TokenExpired()
+    async def decode_token(self, token: str) -> dict:
+        token_data = verified_tokens.get(token)
+
+        if token_data is None:
+            token_data = verify_access_token(token)
+
+            if token_data is None:
+                raise errors.InvalidToken()
         
-        if await token_in_blocklist(jti):
+            if token_data.get('jti') is None:
+                raise errors.TokenExpired()
+
+            verified_tokens.put(token, token_data)
+        
+        if await token_in_blocklist(token_data['jti']):
             raise errors.InvalidToken()
             # raise HTTPException(
             #     status_code=status.HTTP_403_FORBIDDEN,
@@ -37,16 +53,8 @@ class AccessPass(HTTPBearer):
             #         "resolution": "Please generate a new token or login again"
             #     }
             # )
-        
-        self.verify_token_data(token_data)
-        
-        return token_data
-    
-    def is_token_valid(self, token: str) -> bool:
-        
-        token_data = verify_access_token(token)
 
-        return True if token_data is not None else False
+        return token_data
 
     def verify_token_data(self, token_data):
         raise NotImplementedError("Please override this method in child classes")
@@ -64,7 +72,11 @@ class RefreshTokenBearer(AccessPass):
             raise errors.RefreshToken()
 
 
-async def get_current_user(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+access_token_bearer = AccessTokenBearer()
+refresh_token_bearer = RefreshTokenBearer()
+
+
+async def get_current_user(token_details: dict = Depends(access_token_bearer), session: AsyncSession = Depends(get_session)):
     user_data = token_details['user']['email']
 
     user = await user_service.get_user_by_email(user_data, session)
@@ -75,16 +87,36 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = [role.lower() for role in allowed_roles]
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
+    async def __call__(self, token_details: dict = Depends(access_token_bearer), session: AsyncSession = Depends(get_session)) -> Any:
+
+        is_verified, role = await self.resolve_claims(token_details['user'], session)
 
-        if not current_user.is_verified:
+        if not is_verified:
             raise errors.AccountNotVerified()
         
-        user_role = current_user.role.lower()
+        user_role = role.lower()
         if user_role in self.allowed_roles:
             return True
         
         raise errors.RoleCheckAccess()
 
-access_token_bearer = AccessTokenBearer()
-refresh_token_bearer = RefreshTokenBearer()
\ No newline at end of file
+    async def resolve_claims(self, claims: dict, session: AsyncSession) -> tuple[bool, str]:
+        """
+        Read role and is_verified from the signed token when it carries them and its
+        authz_version is still current, otherwise fall back to the users table.
+        """
+        if Config.STATELESS_AUTHZ and 'authz_version' in claims:
+            current_version = await get_authz_version(claims['user_uid'])
+
+            if current_version is not None:
+                if claims['authz_version'] < current_version:
+                    raise errors.InvalidToken()
+
+                return claims['is_verified'], claims['role']
+
+        current_user = await user_service.get_user_by_email(claims['email'], session)
+
+        if current_user is None:
+            raise errors.UserNotFound()
+
+        return current_user.is_verified, current_user.role
\ No newline at end of file
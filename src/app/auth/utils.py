@@ -1,9 +1,15 @@
 import uuid
 import jwt
+import time
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import timedelta, datetime, timezone
 from src.config import Config
+from src.app import errors
 from itsdangerous import URLSafeTimedSerializer
 
 passwd_context = CryptContext(
@@ -19,6 +25,86 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     return passwd_context.verify(password, hashed_password)
 
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded thread pool so hashing never blocks the event loop.
+    Calls beyond max_workers + max_queue are rejected instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise errors.ServerBusy()
+
+            self.in_flight += 1
+
+        try:
+            future = self._executor.submit(self._timed, fn, time.perf_counter(), *args)
+        except RuntimeError:
+            self._release(None)
+            raise
+
+        # the slot is freed when the work itself finishes (or is cancelled before it starts),
+        # not when the awaiting request goes away, so the bound holds under cancellation
+        future.add_done_callback(self._release)
+
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+            if future is not None and not future.cancelled() and future.exception() is None:
+                self.completed += 1
+
+    def _timed(self, fn, submitted_at: float, *args):
+        waited = time.perf_counter() - submitted_at
+
+        # runs on the worker threads, so the totals are updated under the same lock as the counters
+        with self._lock:
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+
+        return fn(*args)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_limit": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_total_seconds": self.queue_wait_total,
+                "queue_wait_max_seconds": self.queue_wait_max
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(max_workers=Config.PASSWORD_HASH_WORKERS, max_queue=Config.PASSWORD_HASH_QUEUE)
+
 def create_access_token(user_data: dict, expiry: timedelta = None, refresh: bool = False):
     payload = {}
 
@@ -44,7 +130,7 @@ def verify_access_token(token: str) -> dict:
         )
 
         if 'jti' not in token_data:
-            raise KeyError("Token does not contain 'jti' field.")
+            raise jwt.InvalidTokenError("Token does not contain 'jti' field.")
         
         return token_data
     except jwt.ExpiredSignatureError as e:
@@ -52,11 +138,63 @@ def verify_access_token(token: str) -> dict:
         logging.warning("Token has expired.")
         return {"error": str(e)}
 
-    except jwt.PyJWKError as e:
-        logging.exception(e)
+    except (jwt.InvalidTokenError, jwt.PyJWKError) as e:
+        # bad signature, malformed token, missing claims: the caller answers InvalidToken
+        logging.warning(f"Rejected token: {e}")
         return None
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of recently verified tokens so repeat requests skip the HMAC check and JSON decode.
+    Entries never outlive the token's own exp claim.
+    """
+
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, token: str) -> dict | None:
+        entry = self._entries.get(token)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, token_data = entry
+
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+
+        return token_data
+
+    def put(self, token: str, token_data: dict) -> None:
+        expires_at = min(time.time() + self.ttl, token_data.get('exp', 0))
+
+        if expires_at <= time.time():
+            return
+
+        self._entries[token] = (expires_at, token_data)
+        self._entries.move_to_end(token)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+verified_tokens = VerifiedTokenCache(max_size=Config.TOKEN_CACHE_SIZE, ttl=Config.TOKEN_CACHE_TTL)
+
+
 def create_url_safe_token(data: dict):
     url_serializer = URLSafeTimedSerializer(
         secret_key=Config.JWT_SECRET,
@@ -0,0 +1,67 @@
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+EMAIL_TEMPLATES = ("verify_email", "password_reset", "notification")
+
+
+class EmailTemplates:
+    """
+    Compiled Jinja2 email templates, kept in memory for the life of the worker.
+    load() compiles every template up front; auto_reload is off so rendering
+    never touches the filesystem again.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            auto_reload=False
+        )
+        self._compiled: dict[str, Template] = {}
+
+    def load(self, names: tuple[str, ...] = EMAIL_TEMPLATES) -> None:
+        for name in names:
+            self._compiled[name] = self._env.get_template(f"{name}.html")
+
+    def get(self, name: str) -> Template:
+        template = self._compiled.get(name)
+
+        if template is None:
+            template = self._compiled[name] = self._env.get_template(f"{name}.html")
+
+        return template
+
+    def render(self, name: str, context: dict) -> str:
+        return self.get(name).render(context)
+
+    def render_many(self, name: str, contexts: list[dict]) -> list[str]:
+        """Render one template for many recipients, e.g. a digest or an announcement"""
+        render = self.get(name).render
+
+        return [render(context) for context in contexts]
+
+    def render_batch(self, messages: list[dict]) -> list[str]:
+        """
+        Bodies for a mixed batch of {template, context} or {body} messages, in order.
+        Messages are grouped by template so each one is looked up once per batch.
+        """
+        bodies = [message.get("body") for message in messages]
+        groups: dict[str, list[int]] = {}
+
+        for index, message in enumerate(messages):
+            if message.get("template") is not None:
+                groups.setdefault(message["template"], []).append(index)
+
+        for name, indexes in groups.items():
+            rendered = self.render_many(name, [messages[index].get("context") or {} for index in indexes])
+
+            for index, body in zip(indexes, rendered):
+                bodies[index] = body
+
+        return bodies
+
+
+email_templates = EmailTemplates(TEMPLATE_DIR)
\ No newline at end of file
@@ -60,6 +60,26 @@ class AccountNotVerified(ExceptionSystemManager):
     """Account has not been verified"""
     pass
 
+class InvalidCursor(ExceptionSystemManager):
+    """Pagination cursor is malformed"""
+    pass
+
+class ServerBusy(ExceptionSystemManager):
+    """Server is at capacity, try again shortly"""
+    pass
+
+class PreconditionFailed(ExceptionSystemManager):
+    """Resource was modified since the version the client sent"""
+    pass
+
+class InvalidBulkPayload(ExceptionSystemManager):
+    """Bulk request body must be a JSON array or NDJSON"""
+    pass
+
+class BulkLimitExceeded(ExceptionSystemManager):
+    """Bulk request has more rows or bytes than allowed"""
+    pass
+
 def create_exception_handler(status_code: int, initial_detail: Any) -> Callable[[Request, Exception], JSONResponse]:
 
     async def exception_handler(request: Request, exception: ExceptionSystemManager):
@@ -225,6 +245,69 @@ def register_all_errors(app: FastAPI):
         )
     )
 
+    # InvalidCursor
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid pagination cursor",
+                "resolution": "Use the next_cursor value returned by the previous page",
+                "error_code": "invalid_cursor"
+            }
+        )
+    )
+
+    # ServerBusy
+    app.add_exception_handler(
+        ServerBusy,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "Server is busy",
+                "resolution": "Please try again in a few seconds",
+                "error_code": "server_busy"
+            }
+        )
+    )
+
+    # PreconditionFailed
+    app.add_exception_handler(
+        PreconditionFailed,
+        create_exception_handler(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            initial_detail={
+                "message": "The resource has been modified by another request",
+                "resolution": "Fetch the latest version and send its ETag in If-Match",
+                "error_code": "version_conflict"
+            }
+        )
+    )
+    # InvalidBulkPayload
+    app.add_exception_handler(
+        InvalidBulkPayload,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid bulk payload",
+                "resolution": "Send a JSON array of jobs or one JSON job per line (application/x-ndjson)",
+                "error_code": "invalid_bulk_payload"
+            }
+        )
+    )
+    # BulkLimitExceeded
+    app.add_exception_handler(
+        BulkLimitExceeded,
+        create_exception_handler(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            initial_detail={
+                "message": "Too many rows or bytes in a single bulk request",
+                "resolution": "Split the request into smaller batches",
+                "error_code": "bulk_limit_exceeded"
+            }
+        )
+    )
+
     #server exception handler
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
@@ -0,0 +1,18 @@
+from typing import Optional
+from src.app import errors
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Version a client expects to overwrite, from an If-Match header such as "3" or W/"3"."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    value = if_match.strip().removeprefix("W/").strip('"')
+
+    try:
+        return int(value)
+    except ValueError:
+        raise errors.PreconditionFailed()
\ No newline at end of file
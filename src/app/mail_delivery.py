@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from email.message import EmailMessage
+from email.utils import formataddr
+import aiosmtplib
+from src.config import Config
+
+
+# connection-level failures and 4xx replies are worth another attempt; 5xx replies are not
+TRANSIENT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError
+)
+
+
+def build_message(recipients: list[str], subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((Config.MAIL_FROM_NAME, Config.MAIL_FROM)) if Config.MAIL_FROM_NAME else Config.MAIL_FROM
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+
+    return message
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return False
+
+    return isinstance(error, aiosmtplib.SMTPResponseException) and 400 <= error.code < 500
+
+
+class MailDeliveryEngine:
+    """
+    Delivers mail for the Celery worker from one long-lived event loop thread.
+    pool_size connections are opened and authenticated once and reused; each pulls
+    up to batch_size queued messages at a time, so a burst of mail shares the same
+    TLS sessions. Transient failures reconnect and retry with exponential backoff.
+
+    A prefork Celery child runs one task at a time and send_email blocks until its
+    message is out, so single sends go one after another over a reused connection:
+    only send_bulk_email (or a thread/gevent pool) keeps more than one connection busy.
+    Scale single-send throughput with worker concurrency, not MAIL_POOL_SIZE.
+    """
+
+    def __init__(self, pool_size: int, batch_size: int, max_retries: int, retry_backoff: float) -> None:
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.connects = 0
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._workers = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="mail-delivery", daemon=True)
+            self._thread.start()
+
+            asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop).result()
+
+    async def _start_workers(self) -> None:
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool_size)]
+
+    def submit(self, message: EmailMessage) -> Future:
+        """Queue a message for delivery; the returned future resolves once it is sent or has failed for good"""
+        self.start()
+
+        future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (message, future))
+
+        return future
+
+    def send(self, message: EmailMessage, timeout: float = None) -> None:
+        self.submit(message).result(timeout)
+
+    def send_many(self, messages: list[EmailMessage], timeout: float = None) -> list[Exception | None]:
+        """Queue every message at once and wait for all of them; returns the error (or None) per message"""
+        futures = [self.submit(message) for message in messages]
+
+        return [future.exception(timeout) for future in futures]
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=Config.MAIL_SERVER,
+            port=Config.MAIL_PORT,
+            use_tls=Config.MAIL_SSL_TLS,
+            start_tls=Config.MAIL_STARTTLS,
+            validate_certs=Config.VALIDATE_CERTS,
+            timeout=Config.MAIL_TIMEOUT
+        )
+        await client.connect()
+
+        if Config.USE_CREDENTIALS:
+            await client.login(Config.MAIL_USERNAME, Config.MAIL_PASSWORD)
+
+        self.connects += 1
+
+        return client
+
+    async def _worker(self) -> None:
+        client = None
+
+        try:
+            while True:
+                batch = [await self._queue.get()]
+
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                for message, future in batch:
+                    try:
+                        client = await self._deliver(client, message, future)
+                    finally:
+                        self._queue.task_done()
+        finally:
+            if client is not None and client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+
+    async def _deliver(self, client, message: EmailMessage, future: Future):
+        """Send one message over client, reconnecting as needed; returns the connection to reuse"""
+        attempt = 0
+
+        while True:
+            try:
+                if client is None or not client.is_connected:
+                    client = await self._connect()
+
+                await client.send_message(message)
+            except Exception as e:
+                # a failed transaction leaves the session in an unknown state, so start afresh
+                if client is not None:
+                    client.close()
+                    client = None
+
+                if attempt >= self.max_retries or not is_transient(e):
+                    self.failed += 1
+                    logging.error(f"Mail delivery to {message['To']} failed: {e}")
+                    future.set_exception(e)
+                    return client
+
+                attempt += 1
+                self.retried += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            else:
+                self.sent += 1
+                future.set_result(None)
+                return client
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "batch_size": self.batch_size,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "connects": self.connects
+        }
+
+    def stop(self, timeout: float = 10) -> None:
+        """Give queued mail up to timeout seconds to go out, then close the connections"""
+        with self._lock:
+            if not self.running:
+                return
+
+            async def drain():
+                try:
+                    await asyncio.wait_for(self._queue.join(), timeout)
+                except asyncio.TimeoutError:
+                    logging.warning(f"Mail engine stopped with {self._queue.qsize()} messages undelivered")
+
+                for worker in self._workers:
+                    worker.cancel()
+
+                await asyncio.gather(*self._workers, return_exceptions=True)
+
+                while not self._queue.empty():
+                    _, future = self._queue.get_nowait()
+                    future.set_exception(RuntimeError("Mail delivery engine stopped"))
+
+            try:
+                asyncio.run_coroutine_threadsafe(drain(), self._loop).result()
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout)
+                self._loop.close()
+                self._thread = None
+
+
+mail_engine = MailDeliveryEngine(
+    pool_size=Config.MAIL_POOL_SIZE,
+    batch_size=Config.MAIL_BATCH_SIZE,
+    max_retries=Config.MAIL_MAX_RETRIES,
+    retry_backoff=Config.MAIL_RETRY_BACKOFF
+)
\ No newline at end of file
@@ -1,29 +1,104 @@
 from fastapi import FastAPI
 from fastapi.requests import Request
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import time
+import uuid
+import random
 import logging
+from src.app.access_log import REQUEST_ID_HEADER, MAX_REQUEST_ID_LENGTH, request_id, should_log, log_request
+from src.app.metrics import http_requests_total, http_request_duration_seconds, http_requests_in_flight
+from src.db.main import QueryStats, query_stats
 
+# replaced by the sampled JSON access log below
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
-def register_all_middlewares(app: FastAPI):
 
-    @app.middleware("http")
-    async def custom_logging(request: Request, call_next):
+class RequestInstrumentation:
+    """
+    Per-request instrumentation as one pure ASGI middleware, so it costs no extra task
+    or memory-stream hop: installs the request's QueryStats and request id, tags the
+    response with X-Request-ID and Server-Timing, records the route metrics and hands
+    a (sampled) entry to the queue-backed JSON access logger.
+    """
 
-        start_time = time.time()
-    
-        response = await call_next(request)
-        processing_time = time.time() - start_time
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} - completed after: {processing_time}s"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        current_id = incoming_id if incoming_id and len(incoming_id) <= MAX_REQUEST_ID_LENGTH else uuid.uuid4().hex
+        method = scope["method"]
+        status_code = 500
+
+        # mutated in place, so queries in child tasks and SQLAlchemy greenlets are counted here
+        stats = QueryStats()
+        stats_token = query_stats.set(stats)
+        id_token = request_id.set(current_id)
+
+        http_requests_in_flight.inc(method)
+        start_time = time.perf_counter()
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - start_time
+
+                headers = MutableHeaders(scope=message)
+                headers.append(REQUEST_ID_HEADER, current_id)
+                headers.append("Server-Timing", f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed * 1000:.1f}')
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            duration = time.perf_counter() - start_time
+            query_stats.reset(stats_token)
+            request_id.reset(id_token)
+            http_requests_in_flight.dec(method)
+
+            # label by route template (/jobs/{job_uid}), never the raw path, to keep cardinality bounded
+            route = scope.get("route")
+            route_path = route.path if route is not None else None
+
+            http_requests_total.inc(method, route_path or "unmatched", str(status_code))
+            http_request_duration_seconds.observe(duration, method, route_path or "unmatched")
+
+            duration_ms = duration * 1000
+
+            if should_log(status_code, duration_ms, random.random()):
+                client = scope.get("client")
+
+                log_request({
+                    "request_id": current_id,
+                    "method": method,
+                    "path": scope["path"],
+                    "route": route_path,
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "db_queries": stats.count,
+                    "db_ms": round(stats.duration * 1000, 2),
+                    "client": f"{client[0]}:{client[1]}" if client else None,
+                    "user_agent": Headers(scope=scope).get("user-agent")
+                })
+
+
+def register_all_middlewares(app: FastAPI):
+
+    # innermost of the stack, inside CORS and trusted-host checks
+    app.add_middleware(RequestInstrumentation)
 
-        print(message)
-        return response
-    
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -1,11 +1,17 @@
-from sqlmodel import SQLModel, Column, Field, ForeignKey, Relationship, Text
+from sqlmodel import SQLModel, Column, Field, ForeignKey, Relationship, Text, Integer
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import Enum as PgEnum, UniqueConstraint
+from sqlalchemy import Enum as PgEnum, UniqueConstraint, Index, Computed, text
 from datetime import datetime
 from typing import List, Optional
 import uuid
 
 
+SEARCH_CONFIG = "english"
+JOB_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
 class User(SQLModel, table=True):
     __tablename__ = "users"
 
@@ -21,9 +27,16 @@ class User(SQLModel, table=True):
     role: str = Field(sa_column=Column(pg.VARCHAR, nullable=False, server_default="user"))
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    version: int = Field(default=1, sa_column=Column(Integer, nullable=False, server_default="1"))
+
+    # relationships never load implicitly; services opt in with selectinload() where a response needs them
+    job: List["Job"] = Relationship(back_populates="employer", sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True})
+    application: List["Application"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True})
 
-    job: List["Job"] = Relationship(back_populates="employer", sa_relationship_kwargs={"lazy": "selectin"})
-    application: List["Application"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "selectin"})
+    __table_args__ = (
+        Index("uq_users_email_address_lower", text("lower(email_address)"), unique=True),
+        Index("ix_users_created_at_uid", "created_at", "uid"),
+    )
 
     def __repr__(self):
         return f"<User id={self.uid}, username={self.username}, email={self.email_address}>"
@@ -37,23 +50,56 @@ class Job(SQLModel, table=True):
     location: str
     salary: str
     is_active: bool = Field(default=False)
-    employer_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("users.uid"), nullable=False))
+    employer_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("users.uid", ondelete="CASCADE"), nullable=False))
     created_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+    version: int = Field(default=1, sa_column=Column(Integer, nullable=False, server_default="1"))
+    # kept in step by a trigger on applications (see migrations), never written by the app
+    application_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    search_vector: Optional[str] = Field(default=None, exclude=True, sa_column=Column(pg.TSVECTOR, Computed(JOB_SEARCH_VECTOR, persisted=True)))
+
+    employer: Optional["User"] = Relationship(back_populates="job", sa_relationship_kwargs={"lazy": "raise"})
+    application: List["Application"] = Relationship(back_populates="job", sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True})
 
-    employer: Optional["User"] = Relationship(back_populates="job")
-    application: List["Application"] = Relationship(back_populates="job", sa_relationship_kwargs={"lazy": "selectin"})
+    __table_args__ = (
+        Index("ix_jobs_created_at_uid", "created_at", "uid"),
+        Index("ix_jobs_employer_uid_created_at", "employer_uid", "created_at", "uid"),
+        Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # search_vector stays in the table but is not mapped: it is only used in search's WHERE/ORDER BY
+    # (through Job.__table__.c), so it never rides along in select(Job) or UPDATE ... RETURNING Job
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
 
 class Application(SQLModel, table=True):
     __tablename__ = "applications"
 
     uid: uuid.UUID = Field(default_factory=uuid.uuid4, sa_column=Column(pg.UUID(as_uuid=True), nullable=False, primary_key=True))
-    job_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("jobs.uid"), nullable=False))
-    user_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("users.uid"), nullable=False))
+    job_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("jobs.uid", ondelete="CASCADE"), nullable=False))
+    user_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("users.uid", ondelete="CASCADE"), nullable=False))
     cover_letter: str = Field(sa_column=Column(Text, nullable=False))
     created_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+    version: int = Field(default=1, sa_column=Column(Integer, nullable=False, server_default="1"))
+
+    job: Optional["Job"] = Relationship(back_populates="application", sa_relationship_kwargs={"lazy": "raise"})
+    user: Optional["User"] = Relationship(back_populates="application", sa_relationship_kwargs={"lazy": "raise"})
+
+    __table_args__ = (
+        UniqueConstraint("job_uid", "user_uid", name="uq_job_seeker"),
+        Index("ix_applications_job_uid_created_at", "job_uid", "created_at", "uid"),
+        Index("ix_applications_user_uid_created_at", "user_uid", "created_at", "uid"),
+        Index("ix_applications_created_at_uid", "created_at", "uid"),
+    )
 
-    job: Optional["Job"] = Relationship(back_populates="application")
-    user: Optional["User"] = Relationship(back_populates="application")
 
-    __table_args__ = (UniqueConstraint("job_uid", "user_uid", name="uq_job_seeker"),)
+class OutboxMessage(SQLModel, table=True):
+    """A Celery task to publish, written in the same transaction as the change that caused it"""
+    __tablename__ = "outbox"
+
+    uid: uuid.UUID = Field(default_factory=uuid.uuid4, sa_column=Column(pg.UUID(as_uuid=True), nullable=False, primary_key=True))
+    task: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
+    payload: dict = Field(sa_column=Column(pg.JSONB, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+
+    __table_args__ = (
+        Index("ix_outbox_created_at", "created_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,110 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+from uuid import UUID
+from fastapi import Query
+from sqlalchemy import tuple_, desc
+from src.app import errors
+
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+
+def encode_cursor(created_at: datetime, uid: UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(uid)], separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, uid = json.loads(base64.urlsafe_b64decode(padded))
+
+        return datetime.fromisoformat(created_at), UUID(uid)
+    except (ValueError, TypeError, binascii.Error):
+        raise errors.InvalidCursor()
+
+
+def encode_offset_cursor(offset: int) -> str:
+    payload = json.dumps({"offset": offset}, separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_offset_cursor(cursor: Optional[str]) -> int:
+    if cursor is None:
+        return 0
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded))["offset"]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise errors.InvalidCursor()
+
+    if not isinstance(offset, int) or offset < 0:
+        raise errors.InvalidCursor()
+
+    return offset
+
+
+def keyset_paginate(statement, model, limit: int, cursor: Optional[str] = None):
+    """
+    Order a statement newest first over (created_at, uid) and seek past the cursor.
+    One extra row is fetched so build_page can tell whether another page exists.
+    """
+    if cursor is not None:
+        created_at, uid = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.uid) < (created_at, uid))
+
+    return statement.order_by(desc(model.created_at), desc(model.uid)).limit(limit + 1)
+
+def build_page(rows: Sequence, limit: int) -> dict:
+    items = list(rows[:limit])
+    next_cursor = None
+
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.uid)
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def match_timezone(value: datetime, aware: bool) -> datetime:
+    """
+    Fit a query datetime to the column: users.created_at is a naive TIMESTAMP (server
+    local time, from datetime.now) while jobs and applications use TIMESTAMPTZ.
+    Naive values are read as server local time, like the rows themselves.
+    """
+    if aware:
+        return value if value.tzinfo is not None else value.astimezone()
+
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+class ListParams:
+    """Paging and created_at range shared by every listing endpoint"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+        cursor: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+        self.created_after = created_after
+        self.created_before = created_before
+
+    def apply(self, statement, model):
+        aware = model.created_at.type.timezone
+
+        if self.created_after is not None:
+            statement = statement.where(model.created_at >= match_timezone(self.created_after, aware))
+
+        if self.created_before is not None:
+            statement = statement.where(model.created_at < match_timezone(self.created_before, aware))
+
+        return keyset_paginate(statement, model, self.limit, self.cursor)
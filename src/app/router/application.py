@@ -1,12 +1,17 @@
-from fastapi import APIRouter, status, HTTPException, Depends
-from fastapi.responses import JSONResponse
+import io
+import csv
+import json
+from fastapi import APIRouter, status, HTTPException, Depends, Query, Response, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 from src.app import schemas, models, errors
 from src.app.auth.dependencies import access_token_bearer, RoleChecker
 from src.app.services import job_service, user_service, application_service as apps
-from src.db.main import get_session
+from src.app.pagination import ListParams
+from src.app.etag import etag, parse_if_match
+from src.db.main import get_session, get_read_session
 
 
 apps_router = APIRouter(
@@ -14,6 +19,9 @@ apps_router = APIRouter(
 )
 who_can_apply = Depends(RoleChecker(["user"]))
 general_roles = Depends(RoleChecker(["user", "admin", "employer"]))
+who_can_export = Depends(RoleChecker(["employer", "admin"]))
+
+EXPORT_COLUMNS = ["uid", "job_uid", "user_uid", "cover_letter", "created_at"]
 
 
 async def parse_uuid_or_404(user_id: str) -> UUID:
@@ -23,22 +31,51 @@ async def parse_uuid_or_404(user_id: str) -> UUID:
         raise errors.InvalidId()
 
 
-@apps_router.get('/applications', status_code=status.HTTP_200_OK, response_model=List[schemas.Application], dependencies=[general_roles])
-async def get_all_apps(session: AsyncSession = Depends(get_session), current_user: models.User = Depends(access_token_bearer)):
-    applications = await apps.get_applications(session)
+async def csv_export(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    async for rows in batches:
+        writer.writerows((row.uid, row.job_uid, row.user_uid, row.cover_letter, row.created_at.isoformat()) for row in rows)
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+async def ndjson_export(batches):
+    async for rows in batches:
+        yield "".join(
+            json.dumps({
+                "uid": str(row.uid),
+                "job_uid": str(row.job_uid),
+                "user_uid": str(row.user_uid),
+                "cover_letter": row.cover_letter,
+                "created_at": row.created_at.isoformat()
+            }) + "\n"
+            for row in rows
+        )
+
+
+@apps_router.get('/applications', status_code=status.HTTP_200_OK, response_model=schemas.Page[schemas.ApplicationSummary], dependencies=[general_roles])
+async def get_all_apps(job_uid: Optional[UUID] = None, user_uid: Optional[UUID] = None, params: ListParams = Depends(), session: AsyncSession = Depends(get_read_session), current_user: models.User = Depends(access_token_bearer)):
+    applications = await apps.get_applications(session, params, job_uid=job_uid, user_uid=user_uid)
 
     return applications
 
 
-@apps_router.get('/applications/list/{job_uid}', status_code=status.HTTP_200_OK, response_model=List[schemas.Application], dependencies=[general_roles])
-async def get_job_applications(job_uid: str, session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+@apps_router.get('/applications/list/{job_uid}', status_code=status.HTTP_200_OK, response_model=schemas.Page[schemas.ApplicationSummary], dependencies=[general_roles])
+async def get_job_applications(job_uid: str, user_uid: Optional[UUID] = None, params: ListParams = Depends(), session: AsyncSession = Depends(get_read_session), token_details=Depends(access_token_bearer)):
 
     job = await job_service.get_job_by_id(job_uid, session)
 
     if job is None:
         raise errors.JobNotFound()
 
-    job_applications = await apps.get_job_applications(job.uid, session)
+    job_applications = await apps.get_job_applications(job.uid, session, params, user_uid=user_uid)
 
     return job_applications
 
@@ -53,19 +90,58 @@ async def create_application(job_id: str, payload: schemas.ApplicationCreate, se
     return new_application
 
 
-@apps_router.get('/applications/list', status_code=status.HTTP_200_OK, response_model=List[schemas.Application], dependencies=[general_roles])
-async def get_user_applications(session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+@apps_router.get('/applications/list', status_code=status.HTTP_200_OK, response_model=schemas.Page[schemas.ApplicationSummary], dependencies=[general_roles])
+async def get_user_applications(job_uid: Optional[UUID] = None, params: ListParams = Depends(), session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
     current_user = token_details.get('user')['user_uid']
- 
-    user_applications = await apps.get_user_applications(current_user, session)
+
+    # the caller's own applications are read from the primary, so one just made is never missing to replica lag
+    user_applications = await apps.get_user_applications(current_user, session, params, job_uid=job_uid)
 
     return user_applications
 
+@apps_router.get('/applications/export', status_code=status.HTTP_200_OK, dependencies=[who_can_export])
+async def export_applications(
+    job_uid: Optional[UUID] = None,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    """
+    Stream every application (cover letters included) for one of the employer's jobs,
+    or for all of them, as CSV or NDJSON. Rows are fetched in batches from a
+    server-side cursor so memory stays flat however many applications there are.
+    """
+    current_user = token_details.get('user')['user_uid']
+
+    if job_uid is not None:
+        job = await job_service.get_job_by_id(job_uid, session)
+
+        if job is None:
+            raise errors.JobNotFound()
+
+        if job.employer_uid != UUID(current_user):
+            raise errors.NotAuthorized()
+
+    batches = apps.stream_employer_applications(current_user, job_uid)
+
+    if export_format == "ndjson":
+        body, media_type = ndjson_export(batches), "application/x-ndjson"
+    else:
+        body, media_type = csv_export(batches), "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="applications.{export_format}"'}
+    )
+
+
 @apps_router.get('/applications/{application_uid}', status_code=status.HTTP_200_OK, response_model=schemas.Application, dependencies=[general_roles])
-async def get_application(application_id: str, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
+async def get_application(application_id: str, response: Response, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
     application = await apps.get_application_by_id(application_id, session)
 
     if application is not None:
+        response.headers["ETag"] = etag(application.version)
         return application
     
     else:
@@ -74,23 +150,18 @@ async def get_application(application_id: str, session: AsyncSession = Depends(g
 
 
 @apps_router.put('/applications/{application_uid}', status_code=status.HTTP_202_ACCEPTED, response_model=schemas.Application, dependencies=[general_roles])
-async def update_application(application_id: str, payload: schemas.ApplicationUpdate, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+async def update_application(application_id: str, payload: schemas.ApplicationUpdate, response: Response, if_match: Optional[str] = Header(None), session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
 
-    application_to_update = await apps.get_application_by_id(application_id, session)
+    application_uid = await parse_uuid_or_404(application_id)
 
-    #granting access to the endpoint
-    current_user = token_details.get('user')['user_uid']
-    if application_to_update.user_uid != UUID(current_user):
-        raise errors.NotAuthorized()
+    #granting access to the endpoint happens in the same statement as the update
+    current_user = UUID(token_details.get('user')['user_uid'])
 
-    if application_to_update is not None:
+    update_application = await apps.update_application(application_uid, payload, session, current_user, parse_if_match(if_match))
 
-        update_application = await apps.update_application(application_id, payload, session)
+    response.headers["ETag"] = etag(update_application.version)
 
-        return update_application
-    
-    else:
-        raise errors.ApplicationNotFound()
+    return update_application
 
 
 
@@ -98,15 +169,9 @@ async def update_application(application_id: str, payload: schemas.ApplicationUp
 @apps_router.delete('/applications/{application_uid}', status_code=status.HTTP_204_NO_CONTENT, dependencies=[general_roles])
 async def delete_application(application_id: str, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
 
-    apps_to_delete = await apps.get_application_by_id(application_id, session)
-    if not apps_to_delete:
-        raise errors.ApplicationNotFound()
-
+    application_uid = await parse_uuid_or_404(application_id)
     current_user = UUID(token_details.get('user')['user_uid'])
-
-    if apps_to_delete.user_uid != current_user:
-        raise errors.NotAuthorized()
     
-    await apps.delete_application(application_id, session)
+    await apps.delete_application(application_uid, session, current_user)
 
 
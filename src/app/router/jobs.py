@@ -1,12 +1,17 @@
-from fastapi import APIRouter, status, HTTPException, Depends
+import json
+from fastapi import APIRouter, status, HTTPException, Depends, Query, Request, Response, Header
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from typing import List
+from pydantic import ValidationError
+from typing import List, Optional
 from src.app import schemas, models, errors
 from src.app.auth.dependencies import access_token_bearer, RoleChecker
-from src.app.services import job_service, user_service
-from src.db.main import get_session
+from src.app.services import job_service, user_service, application_service
+from src.app.pagination import ListParams, DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from src.app.etag import etag, parse_if_match
+from src.db.main import get_session, get_read_session
+from src.config import Config
 
 
 job_router = APIRouter(
@@ -23,22 +28,120 @@ async def parse_uuid_or_404(user_id: str) -> UUID:
         raise errors.InvalidId()
 
 
-@job_router.get('/jobs', status_code=status.HTTP_200_OK, response_model=List[schemas.Job], dependencies=[general_roles])
-async def get_all_jobs(session: AsyncSession = Depends(get_session), current_user: models.User = Depends(access_token_bearer)):
-    jobs = await job_service.get_all_jobs(session)
+async def read_bulk_body(request: Request):
+    """Stream the request body, refusing it as soon as it is (or claims to be) over BULK_JOB_MAX_BYTES"""
+    content_length = request.headers.get("content-length", "")
+
+    if content_length.isdigit() and int(content_length) > Config.BULK_JOB_MAX_BYTES:
+        raise errors.BulkLimitExceeded()
+
+    received = 0
+
+    async for chunk in request.stream():
+        received += len(chunk)
+
+        if received > Config.BULK_JOB_MAX_BYTES:
+            raise errors.BulkLimitExceeded()
+
+        yield chunk
+
+
+async def read_bulk_rows(request: Request):
+    """Yield raw job payloads from a JSON array body or a streamed NDJSON body"""
+    content_type = request.headers.get("content-type", "")
+
+    if "ndjson" in content_type:
+        buffer = b""
+
+        async for chunk in read_bulk_body(request):
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+
+            for line in lines:
+                if line.strip():
+                    yield line
+
+        if buffer.strip():
+            yield buffer
+
+        return
+
+    # a JSON array can only be parsed whole, so its size is capped before it is parsed
+    body = b"".join([chunk async for chunk in read_bulk_body(request)])
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise errors.InvalidBulkPayload()
+
+    if not isinstance(rows, list):
+        raise errors.InvalidBulkPayload()
+
+    if len(rows) > Config.BULK_JOB_MAX_ROWS:
+        raise errors.BulkLimitExceeded()
+
+    for row in rows:
+        yield row
+
+
+@job_router.get('/jobs', status_code=status.HTTP_200_OK, response_model=schemas.Page[schemas.JobSummary], dependencies=[general_roles])
+async def get_all_jobs(params: ListParams = Depends(), session: AsyncSession = Depends(get_read_session), current_user: models.User = Depends(access_token_bearer)):
+    jobs = await job_service.get_all_jobs(session, params)
 
     return jobs
 
 
+@job_router.get('/jobs/search', status_code=status.HTTP_200_OK, response_model=schemas.Page[schemas.JobSearchHit], dependencies=[general_roles])
+async def search_jobs(
+    q: str = Query(min_length=1, max_length=200),
+    location: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+    token_details=Depends(access_token_bearer)
+):
+    hits = await job_service.search_jobs(q, session, limit, cursor, location=location, is_active=is_active)
+
+    return hits
+
+
 @job_router.get('/jobs/{job_uid}', status_code=status.HTTP_200_OK, response_model=schemas.JobDetails, dependencies=[general_roles])
-async def get_job(job_uid: str, session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+async def get_job(
+    job_uid: str,
+    response: Response,
+    include: Optional[str] = Query(None, pattern="^applications$"),
+    applications_limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    applications_cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details=Depends(access_token_bearer)
+):
+    """
+    The job row with its application_count. With include=applications the job's
+    owner also gets the first page of application summaries embedded.
+    """
+    job_id = await parse_uuid_or_404(job_uid)
+
+    job = await job_service.get_job_details(job_id, session)
+
+    if job is None:
+        raise errors.JobNotFound()
 
-    job = await job_service.get_job_by_id(job_uid, session)
+    response.headers["ETag"] = etag(job.version)
 
-    if job is not None:
+    if include is None:
         return job
 
-    raise errors.JobNotFound()
+    if job.employer_uid != UUID(token_details.get('user')['user_uid']):
+        raise errors.NotAuthorized()
+
+    params = ListParams(limit=applications_limit, cursor=applications_cursor, created_after=None, created_before=None)
+    applications = await application_service.get_job_applications(job_id, session, params)
+
+    # the page holds Rows of summary columns, not dicts
+    applications = schemas.Page[schemas.ApplicationSummary].model_validate(applications, from_attributes=True)
+
+    return schemas.JobDetails(**job.model_dump(), applications=applications)
 
 @job_router.post('/jobs', status_code=status.HTTP_201_CREATED, response_model=schemas.Job, dependencies=[job_listing_role])
 async def create_job(payload: schemas.JobCreate, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
@@ -49,12 +152,67 @@ async def create_job(payload: schemas.JobCreate, session: AsyncSession = Depends
 
     return new_job
 
-@job_router.get('/jobs/employer_listed_jobs/{user_uid}', status_code=status.HTTP_200_OK, dependencies=[general_roles])
+@job_router.post('/jobs/bulk', status_code=status.HTTP_201_CREATED, response_model=schemas.BulkJobResponse, dependencies=[job_listing_role])
+async def create_jobs_bulk(request: Request, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+    """
+    Post many jobs at once from a JSON array or NDJSON (application/x-ndjson) body.
+    Rows are validated in one pass; valid rows are inserted together and invalid
+    rows are reported by index without blocking the rest.
+    """
+    current_user = token_details.get('user')['user_uid']
+
+    valid_jobs = []
+    valid_indexes = []
+    results = []
+    index = 0
+
+    async for row in read_bulk_rows(request):
+        if index >= Config.BULK_JOB_MAX_ROWS:
+            raise errors.BulkLimitExceeded()
+
+        try:
+            if isinstance(row, bytes):
+                valid_jobs.append(schemas.JobCreate.model_validate_json(row))
+            else:
+                valid_jobs.append(schemas.JobCreate.model_validate(row))
+
+            valid_indexes.append(index)
+        except ValidationError as e:
+            results.append(schemas.BulkJobResult(index=index, errors=e.errors(include_url=False, include_context=False)))
+
+        index += 1
+
+    new_uids = await job_service.create_jobs_bulk(valid_jobs, session, current_user)
+    created = len(new_uids)
+
+    results.extend(schemas.BulkJobResult(index=i, uid=uid) for i, uid in zip(valid_indexes, new_uids))
+    results.sort(key=lambda result: result.index)
+
+    return schemas.BulkJobResponse(created=created, failed=index - created, results=results)
+
+
+@job_router.post('/jobs/bulk-delete', status_code=status.HTTP_200_OK, response_model=schemas.BulkDeleteResponse, dependencies=[job_listing_role])
+async def delete_jobs_bulk(payload: schemas.BulkDeleteRequest, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+    """Delete many of the employer's listings at once; uids that are missing or not theirs are skipped"""
+    if len(payload.uids) > Config.BULK_JOB_MAX_ROWS:
+        raise errors.BulkLimitExceeded()
+
+    current_user = UUID(token_details.get('user')['user_uid'])
+
+    deleted = await job_service.delete_jobs_bulk(payload.uids, session, current_user)
+
+    skipped = set(payload.uids) - set(deleted)
+
+    return schemas.BulkDeleteResponse(deleted=deleted, skipped=[uid for uid in payload.uids if uid in skipped])
+
+
+@job_router.get('/jobs/employer_listed_jobs/{user_uid}', status_code=status.HTTP_200_OK, response_model=List[schemas.JobSummary], dependencies=[general_roles])
 async def get_employer_jobs(user_uid: str, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
     current_user = token_details.get('user')['user_uid']
     if user_uid != current_user:
         raise errors.NotAuthorized()
-    
+
+    # read-your-writes: the employer's own listings come from the primary, not a lagging replica
     jobs = await job_service.get_employer_jobs(current_user, session)
 
     return jobs
@@ -73,31 +231,21 @@ async def get_employer_jobs(user_uid: str, session: AsyncSession = Depends(get_s
 #     return jobs
 
 @job_router.put('/jobs/{job_uid}', status_code=status.HTTP_202_ACCEPTED, response_model=schemas.Job, dependencies=[general_roles])
-async def update_job(job_uid: str, payload: schemas.JobUpdate, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
-
-    job = await job_service.get_job_by_id(job_uid, session)
-    if not job:
-        raise errors.JobNotFound()
+async def update_job(job_uid: str, payload: schemas.JobUpdate, response: Response, if_match: Optional[str] = Header(None), session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
 
+    job_id = await parse_uuid_or_404(job_uid)
     current_user = UUID(token_details.get('user')['user_uid'])
-
-    if job.employer_uid != current_user:
-        raise errors.NotAuthorized()
     
-    updated_job = await job_service.update_job(job_uid, payload, session)
+    updated_job = await job_service.update_job(job_id, payload, session, current_user, parse_if_match(if_match))
+
+    response.headers["ETag"] = etag(updated_job.version)
     
     return updated_job
 
 @job_router.delete('/jobs/{job_uid}', status_code=status.HTTP_204_NO_CONTENT, dependencies=[general_roles])
 async def delete_job(job_uid: str, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
 
-    job = await job_service.get_job_by_id(job_uid, session)
-    if not job:
-        raise errors.JobNotFound()
-
+    job_id = await parse_uuid_or_404(job_uid)
     current_user = UUID(token_details.get('user')['user_uid'])
-
-    if job.employer_uid != current_user:
-        raise errors.NotAuthorized()
     
-    await job_service.delete_job(job_uid, session)
\ No newline at end of file
+    await job_service.delete_job(job_id, session, current_user)
\ No newline at end of file
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Header
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from src.app import schemas, errors
-from src.db.main import get_session
+from src.db.main import get_session, get_read_session
 from src.app.services import user_service
 from src.app.auth.dependencies import access_token_bearer
 from src.app.auth.dependencies import RoleChecker
+from src.app.pagination import ListParams
+from src.app.etag import etag, parse_if_match
 
 
 role_checker = Depends(RoleChecker(["user", "employer"]))
@@ -15,60 +17,54 @@ user_router = APIRouter(
     tags=["Users"]
 )
 
-# Dependency to handle parsing and validation of the UUID
-async def parse_uuid_or_404(user_id: str) -> UUID:
+# Dependency to handle parsing and validation of the UUID; the parameter name binds the {user_uid} path segment
+async def parse_uuid_or_404(user_uid: str) -> UUID:
     try:
-        return UUID(user_id)
+        return UUID(user_uid)
     except ValueError:
         raise errors.InvalidId()
     
-@user_router.get("/users", status_code=status.HTTP_200_OK, response_model=List[schemas.User], dependencies=[role_checker])
-async def get_all_users(session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
-    users = await user_service.get_all_users(session)
+@user_router.get("/users", status_code=status.HTTP_200_OK, response_model=schemas.Page[schemas.User], dependencies=[role_checker])
+async def get_all_users(role: Optional[str] = None, params: ListParams = Depends(), session: AsyncSession = Depends(get_read_session), token_details=Depends(access_token_bearer)):
+    users = await user_service.get_all_users(session, params, role=role)
     return users
 
 @user_router.get("/users/{user_uid}", status_code=status.HTTP_200_OK, response_model=schemas.UserDetails)
-async def get_user(user_uid: UUID = Depends(parse_uuid_or_404), session: AsyncSession = Depends(get_session), current_user=Depends(access_token_bearer)):
+async def get_user(response: Response, user_uid: UUID = Depends(parse_uuid_or_404), session: AsyncSession = Depends(get_session), current_user=Depends(access_token_bearer)):
 
-    user = await user_service.get_user(user_uid, session)
+    user = await user_service.get_user(user_uid, session, with_details=True)
 
     if not user:
         raise errors.UserNotFound()
+
+    response.headers["ETag"] = etag(user.version)
     
     return user
 
 
 @user_router.put("/users/{user_uid}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.User)
-async def update_user(user_data: schemas.UserUpdate, user_uid: str, session: AsyncSession = Depends(get_session), token_details: dict =Depends(access_token_bearer)):
-
-    user_to_update = await user_service.get_user(user_uid, session)
-
-    if user_to_update is None:
-        raise errors.UserNotFound()
+async def update_user(user_data: schemas.UserUpdate, user_uid: str, response: Response, if_match: Optional[str] = Header(None), session: AsyncSession = Depends(get_session), token_details: dict =Depends(access_token_bearer)):
 
     current_user = UUID(token_details.get('user')['user_uid'])
 
-    if user_to_update.uid != current_user:
+    if await parse_uuid_or_404(user_uid) != current_user:
         raise errors.NotAuthorized()
 
-    updated_user = await user_service.update_user(user_uid, user_data, session)
+    updated_user = await user_service.update_user(current_user, user_data, session, parse_if_match(if_match))
+
+    response.headers["ETag"] = etag(updated_user.version)
 
     return updated_user
 
 @user_router.delete("/users/{user_uid}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_uid:str, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
-    
-    user_to_delete = await user_service.get_user(user_uid, session)
-
-    if user_to_delete is None:
-        raise errors.UserNotFound()
 
     current_user = UUID(token_details.get('user')['user_uid'])
 
-    if user_to_delete.uid != current_user:
+    if await parse_uuid_or_404(user_uid) != current_user:
         raise errors.NotAuthorized()
     
-    await user_service.delete_user(user_uid, session)
+    await user_service.delete_user(current_user, session)
 
     return {"User deleted successfully!"}
 
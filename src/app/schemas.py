@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Generic, TypeVar
 from datetime import datetime
 import uuid
 # from enum import Enum
@@ -29,6 +29,7 @@ class User(UserBase):
     uid: uuid.UUID
     created_at: datetime
     updated_at:datetime
+    version: int = 1
 
 # class Username(BaseModel):
 #     username: str = Optional
@@ -56,6 +57,41 @@ class Job(JobBase):
     uid: uuid.UUID 
     employer_uid: uuid.UUID
     created_at: datetime
+    version: int = 1
+    application_count: int = 0
+
+class JobSummary(BaseModel):
+    uid: uuid.UUID
+    title: str
+    location: str
+    salary: str
+    is_active: bool
+    employer_uid: uuid.UUID
+    created_at: datetime
+    application_count: int
+    snippet: str
+
+class BulkJobResult(BaseModel):
+    index: int
+    uid: Optional[uuid.UUID] = None
+    errors: Optional[List[dict]] = None
+
+class BulkJobResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkJobResult]
+
+class BulkDeleteRequest(BaseModel):
+    uids: List[uuid.UUID] = Field(min_length=1)
+
+class BulkDeleteResponse(BaseModel):
+    deleted: List[uuid.UUID]
+    skipped: List[uuid.UUID]
+
+class JobSearchHit(JobSummary):
+    rank: float
+    title_highlight: str
+    description_highlight: str
 
 class ApplicationCreate(BaseModel):
     cover_letter: str
@@ -69,6 +105,22 @@ class Application(BaseModel):
     user_uid: uuid.UUID
     job_uid: uuid.UUID
     created_at: datetime 
+    version: int = 1
+
+
+class ApplicationSummary(BaseModel):
+    uid: uuid.UUID
+    job_uid: uuid.UUID
+    user_uid: uuid.UUID
+    created_at: datetime
+    cover_letter_snippet: str
+
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
 
 
 class UserDetails(User):
@@ -77,7 +129,7 @@ class UserDetails(User):
 
 
 class JobDetails(Job):
-    application: List[Application]
+    applications: Optional[Page[ApplicationSummary]] = None
 
 
 class EmailModel(BaseModel):
@@ -1,23 +1,136 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, desc
-from uuid import UUID
-from src.app.models import User, Job, Application
-from src.app import schemas
-from src.app.auth.utils import hash_password
+from sqlalchemy import func, insert, update, delete, union
+from sqlalchemy.orm import selectinload, aliased
+from uuid import UUID, uuid4
+from datetime import datetime
+from src.app.models import User, Job, Application, OutboxMessage, SEARCH_CONFIG
+from src.app import schemas, errors
+from src.app.auth.utils import password_hasher
+from src.db.redis import get_cached_job, cache_job, invalidate_job, bump_authz_version
+from src.db.main import read_session_scope
+from src.app.pagination import ListParams, build_page, encode_offset_cursor, decode_offset_cursor
+
+
+MAX_SEARCH_RESULTS = 1000
+EXPORT_BATCH_SIZE = 500
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10, StartSel=<mark>, StopSel=</mark>"
+SNIPPET_LENGTH = 200
+SEND_EMAIL_TASK = "src.celery_tasks.send_email"
+
+# listings select these columns instead of hydrating entities, so the Text
+# columns are only read up to SNIPPET_LENGTH characters
+JOB_SUMMARY_COLUMNS = (
+    Job.uid,
+    Job.title,
+    Job.location,
+    Job.salary,
+    Job.is_active,
+    Job.employer_uid,
+    Job.created_at,
+    Job.application_count,
+    func.substr(Job.description, 1, SNIPPET_LENGTH).label("snippet")
+)
+
+APPLICATION_SUMMARY_COLUMNS = (
+    Application.uid,
+    Application.job_uid,
+    Application.user_uid,
+    Application.created_at,
+    func.substr(Application.cover_letter, 1, SNIPPET_LENGTH).label("cover_letter_snippet")
+)
+
+
+def html_escape(column):
+    """
+    SQL-side html.escape: highlights are meant to be rendered as HTML, so employer text
+    is escaped before ts_headline adds the only markup in them, the <mark> tags.
+    """
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")):
+        column = func.replace(column, char, entity)
+
+    return column
+
+
+async def update_owned(model, uid, owner_column, owner_uid, values: dict, expected_version: int, not_found, session: AsyncSession, *returning):
+    """
+    Apply values in a single UPDATE ... WHERE uid AND owner [AND version] RETURNING,
+    bumping the row's version. Only when no row matches is the row looked up again,
+    to tell not-found, not-owner and version-conflict apart.
+    """
+    statement = update(model).where(model.uid == uid, owner_column == owner_uid)
+
+    if expected_version is not None:
+        statement = statement.where(model.version == expected_version)
+
+    statement = (
+        statement.values(**values, version=model.version + 1)
+        .returning(model, *returning)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+    result = await session.exec(statement)
+    row = result.first()
+
+    if row is not None:
+        await session.commit()
+        return row
+
+    await resolve_owned_miss(model, uid, owner_column, owner_uid, not_found, session)
+
+    raise errors.PreconditionFailed()
+
+async def delete_owned(model, uid, owner_column, owner_uid, not_found, session: AsyncSession, *returning):
+    """Single DELETE ... WHERE uid AND owner RETURNING uid; a miss is resolved like update_owned"""
+    statement = (
+        delete(model)
+        .where(model.uid == uid, owner_column == owner_uid)
+        .returning(model.uid, *returning)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = await session.exec(statement)
+    row = result.first()
+
+    if row is not None:
+        await session.commit()
+        return row
+
+    await resolve_owned_miss(model, uid, owner_column, owner_uid, not_found, session)
+
+    raise not_found()
+
+async def resolve_owned_miss(model, uid, owner_column, owner_uid, not_found, session: AsyncSession) -> None:
+    """Raise not-found or not-authorized for a write that matched no row"""
+    await session.rollback()
+
+    existing = (await session.exec(select(owner_column).where(model.uid == uid))).first()
+
+    if existing is None:
+        raise not_found()
+
+    if existing != owner_uid:
+        raise errors.NotAuthorized()
 
 
 class UserService:
 
-    async def get_all_users(self, session:AsyncSession):
-        statement = select(User).order_by(desc(User.created_at))
+    async def get_all_users(self, session:AsyncSession, params: ListParams, role: str = None):
+        statement = select(User)
 
-        result = await session.exec(statement)
+        if role is not None:
+            statement = statement.where(User.role == role)
 
-        return result.all()
+        result = await session.exec(params.apply(statement, User))
+
+        return build_page(result.all(), params.limit)
     
-    async def get_user(self, user_id: str, session:AsyncSession):
+    async def get_user(self, user_id: str, session:AsyncSession, with_details: bool = False):
         statement = select(User).where(User.uid == user_id)
 
+        if with_details:
+            statement = statement.options(selectinload(User.job), selectinload(User.application))
+
         result = await session.exec(statement)
 
         user = result.first()
@@ -31,7 +144,7 @@ class UserService:
             **user_data_dict
         )
 
-        new_user.hashed_password = hash_password(user_data_dict['hashed_password'])
+        new_user.hashed_password = await password_hasher.hash(user_data_dict['hashed_password'])
 
         session.add(new_user)
 
@@ -39,45 +152,53 @@ class UserService:
 
         return new_user
     
-    async def update_user(self, user_uid: str, user_data: schemas.UserUpdate, session: AsyncSession):
-        user_to_update = await self.get_user(user_uid, session)
+    async def update_user(self, user_uid: UUID, user_data: schemas.UserUpdate, session: AsyncSession, expected_version: int = None):
+        user_data_dict = user_data.model_dump(exclude_unset=True)
+        user_data_dict["updated_at"] = datetime.now()
 
-        if user_to_update is not None:
-            user_data_dict = user_data.model_dump(exclude_unset=True)
+        # subqueries in RETURNING read the statement's snapshot, i.e. the row before this update
+        previous = aliased(User)
+        previous_role = select(previous.role).where(previous.uid == user_uid).scalar_subquery()
 
-            for k, v in user_data_dict.items():
-                setattr(user_to_update, k, v)
+        updated_user, old_role = await update_owned(
+            User, user_uid, User.uid, user_uid, user_data_dict, expected_version, errors.UserNotFound, session, previous_role
+        )
 
-                await session.commit()
+        if updated_user.role != old_role:
+            await bump_authz_version(str(user_uid))
 
-            return user_to_update
-        else:
-            return None
+        return updated_user
     
     async def update_user_info(self, user: User, user_data: dict, session: AsyncSession):
-        
-        for k, v in user_data.items():
-            setattr(user, k, v)
+        """Account verification and password reset; bumps version like every other write, so stale ETags stop matching"""
+        user_data = {**user_data, "updated_at": datetime.now()}
 
-        await session.commit()
+        updated_user, = await update_owned(User, user.uid, User.uid, user.uid, user_data, None, errors.UserNotFound, session)
+
+        if "role" in user_data or "is_verified" in user_data:
+            await bump_authz_version(str(user.uid))
         
-        return user
+        return updated_user
 
 
-    async def delete_user(self, user_uid: str, session: AsyncSession):
-        user_to_delete = await self.get_user(user_uid, session)
+    async def delete_user(self, user_uid: UUID, session: AsyncSession):
+        # jobs and applications go with the user (ON DELETE CASCADE); the RETURNING
+        # subquery still sees them, so their cached job details can be dropped
+        affected = union(
+            select(Job.uid).where(Job.employer_uid == user_uid),
+            select(Application.job_uid).where(Application.user_uid == user_uid)
+        ).subquery()
+        affected_jobs = select(func.array_agg(affected.c.uid)).scalar_subquery()
 
-        if user_to_delete is not None:
-            await session.delete(user_to_delete)
+        _, job_uids = await delete_owned(User, user_uid, User.uid, user_uid, errors.UserNotFound, session, affected_jobs)
 
-            await session.commit()
-        
-        else:
-            return None
+        await invalidate_job(*(str(job_uid) for job_uid in job_uids or []))
+        await bump_authz_version(str(user_uid))
         
     
     async def get_user_by_email(self, user_email: str, session:AsyncSession):
-        statement = select(User).where(User.email_address == user_email)
+        # matches the unique lower(email_address) index
+        statement = select(User).where(func.lower(User.email_address) == user_email.lower())
 
         result = await session.exec(statement)
 
@@ -92,12 +213,12 @@ class UserService:
 
 class JobService():
     
-    async def get_all_jobs(self, session: AsyncSession):
-        statement = select(Job).order_by(desc(Job.created_at))
+    async def get_all_jobs(self, session: AsyncSession, params: ListParams):
+        statement = params.apply(select(*JOB_SUMMARY_COLUMNS), Job)
 
         result = await session.exec(statement)
 
-        return result.all()
+        return build_page(result.all(), params.limit)
     
     async def get_job_by_id(self, job_uid: str, session: AsyncSession):
         statement = select(Job).where(Job.uid == job_uid)
@@ -106,6 +227,27 @@ class JobService():
 
         return result.first()
     
+    async def get_job_details(self, job_uid: UUID, session: AsyncSession):
+        """
+        Read-through cache in front of get_job_by_id. Only the job row is cached;
+        applications are paged separately for the owner on request.
+        """
+        cached = await get_cached_job(str(job_uid))
+
+        if cached is not None:
+            return schemas.Job.model_validate_json(cached)
+
+        job = await self.get_job_by_id(job_uid, session)
+
+        if job is None:
+            return None
+
+        job_details = schemas.Job.model_validate(job, from_attributes=True)
+
+        await cache_job(str(job_uid), job_details.model_dump_json())
+
+        return job_details
+    
     async def get_job_by_location(self, job_location: str, session: AsyncSession):
         statement = select(Job).where(Job.location == job_location)
 
@@ -113,6 +255,55 @@ class JobService():
 
         return result.first()
     
+    async def search_jobs(self, query: str, session: AsyncSession, limit: int, cursor: str = None, location: str = None, is_active: bool = None):
+        """
+        Rank jobs matching query against the stored search_vector (GIN indexed).
+        Headlines are only computed for the rows of the requested page.
+        """
+        offset = decode_offset_cursor(cursor)
+
+        if offset >= MAX_SEARCH_RESULTS:
+            return {"items": [], "next_cursor": None}
+
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        search_vector = Job.__table__.c.search_vector
+        rank = func.ts_rank_cd(search_vector, ts_query).label("rank")
+
+        # the full description is carried through to the page subquery for ts_headline only
+        matches = select(*JOB_SUMMARY_COLUMNS[:-1], Job.description, rank).where(search_vector.op("@@")(ts_query))
+
+        if location is not None:
+            matches = matches.where(func.lower(Job.location) == location.lower())
+
+        if is_active is not None:
+            matches = matches.where(Job.is_active == is_active)
+
+        page = matches.order_by(desc(rank), desc(Job.uid)).offset(offset).limit(limit + 1).subquery()
+
+        statement = select(
+            page.c.uid,
+            page.c.title,
+            page.c.location,
+            page.c.salary,
+            page.c.is_active,
+            page.c.employer_uid,
+            page.c.created_at,
+            page.c.application_count,
+            func.substr(page.c.description, 1, SNIPPET_LENGTH).label("snippet"),
+            page.c.rank,
+            func.ts_headline(SEARCH_CONFIG, html_escape(page.c.title), ts_query, HEADLINE_OPTIONS).label("title_highlight"),
+            func.ts_headline(SEARCH_CONFIG, html_escape(page.c.description), ts_query, HEADLINE_OPTIONS).label("description_highlight")
+        ).order_by(desc(page.c.rank), desc(page.c.uid))
+
+        result = await session.exec(statement)
+        rows = result.all()
+        items = rows[:limit]
+
+        next_offset = offset + limit
+        next_cursor = encode_offset_cursor(next_offset) if len(rows) > limit and next_offset < MAX_SEARCH_RESULTS else None
+
+        return {"items": items, "next_cursor": next_cursor}
+
     async def create_job(self, job_data: schemas.JobCreate, session: AsyncSession, user_uid: str):
 
         job_data_to_dict = job_data.model_dump()
@@ -128,47 +319,82 @@ class JobService():
 
         return new_job
     
+    async def create_jobs_bulk(self, jobs: list[schemas.JobCreate], session: AsyncSession, user_uid: str):
+        """
+        Insert every job in one multi-row INSERT and a single commit. The statement
+        inserts all rows or raises, so the uids generated here are the new uids, in job order.
+        """
+        if not jobs:
+            return []
+
+        employer_uid = UUID(user_uid)
+        created_at = datetime.now()
+
+        rows = [
+            {**job.model_dump(), "uid": uuid4(), "employer_uid": employer_uid, "created_at": created_at}
+            for job in jobs
+        ]
+
+        await session.exec(insert(Job).values(rows))
+        await session.commit()
+
+        return [row["uid"] for row in rows]
+
     async def get_employer_jobs(self, employer_uid: str, session: AsyncSession):
-        statement = select(Job).where(Job.employer_uid == employer_uid).order_by(desc(Job.created_at))
+        statement = select(*JOB_SUMMARY_COLUMNS).where(Job.employer_uid == employer_uid).order_by(desc(Job.created_at))
 
         result = await session.exec(statement)
 
         return result.all()
     
-    async def update_job(self, job_uid: str, payload: schemas.JobUpdate, session: AsyncSession):
-        job_to_update = await self.get_job_by_id(job_uid, session)
-
-        if job_to_update:
-            job_dict_payload = payload.model_dump(exclude_unset=True)
+    async def update_job(self, job_uid: UUID, payload: schemas.JobUpdate, session: AsyncSession, employer_uid: UUID, expected_version: int = None):
+        job_dict_payload = payload.model_dump(exclude_unset=True)
 
-            for k, v in job_dict_payload.items():
-                setattr(job_to_update, k, v)
+        updated_job, = await update_owned(
+            Job, job_uid, Job.employer_uid, employer_uid, job_dict_payload, expected_version, errors.JobNotFound, session
+        )
 
-                await session.commit()
+        await invalidate_job(str(job_uid))
 
-            return job_to_update
-        else:
-            return None
+        return updated_job
     
-    async def delete_job(self, job_uid: str, session: AsyncSession):
+    async def delete_job(self, job_uid: UUID, session: AsyncSession, employer_uid: UUID):
 
-        job_to_delete = await self.get_job_by_id(job_uid, session)
-        
-        if job_to_delete is not None:
-            
-            await session.delete(job_to_delete)
-            await session.commit()
-        
-        else:
-            return None
+        await delete_owned(Job, job_uid, Job.employer_uid, employer_uid, errors.JobNotFound, session)
 
-class ApplicationService():
-    async def get_applications(self, session: AsyncSession):
-        statement = select(Application).order_by(desc(Application.created_at))
+        await invalidate_job(str(job_uid))
+
+    async def delete_jobs_bulk(self, job_uids: list[UUID], session: AsyncSession, employer_uid: UUID):
+        """Delete every listed job the employer owns in one statement; returns the uids deleted"""
+        statement = (
+            delete(Job)
+            .where(Job.uid.in_(job_uids), Job.employer_uid == employer_uid)
+            .returning(Job.uid)
+            .execution_options(synchronize_session=False)
+        )
 
         result = await session.exec(statement)
+        deleted = result.scalars().all()
 
-        return result.all()
+        await session.commit()
+
+        await invalidate_job(*(str(job_uid) for job_uid in deleted))
+
+        return deleted
+
+class ApplicationService():
+    async def get_applications(self, session: AsyncSession, params: ListParams, job_uid: UUID = None, user_uid: UUID = None):
+        statement = select(*APPLICATION_SUMMARY_COLUMNS)
+
+        if job_uid is not None:
+            statement = statement.where(Application.job_uid == job_uid)
+
+        if user_uid is not None:
+            statement = statement.where(Application.user_uid == user_uid)
+
+        result = await session.exec(params.apply(statement, Application))
+
+        return build_page(result.all(), params.limit)
 
     
     async def create_application(self, payload: schemas.ApplicationCreate, applicant_id: str, job_id: str, session: AsyncSession):
@@ -184,21 +410,37 @@ class ApplicationService():
         session.add(new_apps)
         await session.commit()
 
-        return new_apps
-
-    async def get_job_applications(self, job_id: str, session: AsyncSession):
-        statement = select(Application).where(Application.job_uid == job_id).order_by(desc(Application.created_at))
+        await invalidate_job(job_id)
 
-        result = await session.exec(statement)
+        return new_apps
 
-        return result.all()
+    async def get_job_applications(self, job_id: str, session: AsyncSession, params: ListParams, user_uid: UUID = None):
+        return await self.get_applications(session, params, job_uid=job_id, user_uid=user_uid)
     
-    async def get_user_applications(self, user_id: str, session: AsyncSession):
-        statement = select(Application).where(Application.user_uid == user_id).order_by(desc(Application.created_at))
+    async def get_user_applications(self, user_id: str, session: AsyncSession, params: ListParams, job_uid: UUID = None):
+        return await self.get_applications(session, params, job_uid=job_uid, user_uid=user_id)
+
+    async def stream_employer_applications(self, employer_uid: str, job_uid: UUID = None):
+        """
+        Yield batches of application rows for an employer's jobs from a server-side cursor.
+        Opens its own read session because a streamed response outlives the request's session.
+        """
+        statement = (
+            select(Application.uid, Application.job_uid, Application.user_uid, Application.cover_letter, Application.created_at)
+            .join(Job, Job.uid == Application.job_uid)
+            .where(Job.employer_uid == employer_uid)
+            .order_by(Application.created_at, Application.uid)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
 
-        result = await session.exec(statement)
+        if job_uid is not None:
+            statement = statement.where(Application.job_uid == job_uid)
 
-        return result.all()
+        async with read_session_scope() as session:
+            result = await session.stream(statement)
+
+            async for rows in result.partitions():
+                yield rows
 
     async def get_application_by_id(self, application_id: str, session: AsyncSession):
 
@@ -208,33 +450,65 @@ class ApplicationService():
 
         return result.first()
     
-    async def update_application(self, application_id: str, payload: schemas.ApplicationUpdate, session: AsyncSession):
-        
-        application = await self.get_application_by_id(application_id, session)
+    async def update_application(self, application_id: UUID, payload: schemas.ApplicationUpdate, session: AsyncSession, applicant_uid: UUID, expected_version: int = None):
 
         application_to_update = payload.model_dump(exclude_unset=True)
 
-        for k, v in application_to_update.items():
-            setattr(application, k, v)
+        application, = await update_owned(
+            Application, application_id, Application.user_uid, applicant_uid, application_to_update, expected_version, errors.ApplicationNotFound, session
+        )
 
-            await session.commit()
+        await invalidate_job(str(application.job_uid))
         
         return application
     
-    async def delete_application(self, application_id: str, session: AsyncSession):
+    async def delete_application(self, application_id: UUID, session: AsyncSession, applicant_uid: UUID):
 
-        app_to_delete = await self.get_application_by_id(application_id, session)
+        _, job_uid = await delete_owned(
+            Application, application_id, Application.user_uid, applicant_uid, errors.ApplicationNotFound, session, Application.job_uid
+        )
 
-        if app_to_delete is not None:
+        await invalidate_job(str(job_uid))
 
-            await session.delete(app_to_delete)
-            await session.commit()
 
-        else: 
-            return None
 
+class OutboxService():
+    """
+    Tasks are staged in the caller's session and only become visible to the relay
+    (python -m src.outbox_relay) if that transaction commits.
+    """
+
+    def add(self, session: AsyncSession, task: str, payload: dict) -> OutboxMessage:
+        message = OutboxMessage(task=task, payload=payload)
+
+        session.add(message)
+
+        return message
+
+    def add_email(self, session: AsyncSession, recipients: list[str], subject: str, template: str, context: dict) -> OutboxMessage:
+        """The worker renders the template, so the row holds only the (JSON) context"""
+        return self.add(session, SEND_EMAIL_TASK, {"recipients": recipients, "subject": subject, "template": template, "context": context})
+
+    async def claim_batch(self, session: AsyncSession, limit: int):
+        """Lock the oldest pending rows; SKIP LOCKED lets several relays drain the table side by side"""
+        statement = (
+            select(OutboxMessage)
+            .order_by(OutboxMessage.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        result = await session.exec(statement)
+
+        return result.all()
+
+    async def delete_batch(self, session: AsyncSession, uids: list[UUID]):
+        statement = delete(OutboxMessage).where(OutboxMessage.uid.in_(uids)).execution_options(synchronize_session=False)
+
+        await session.exec(statement)
 
 
 user_service = UserService()
 job_service = JobService()
-application_service = ApplicationService()
\ No newline at end of file
+application_service = ApplicationService()
+outbox_service = OutboxService()
\ No newline at end of file
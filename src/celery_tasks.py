@@ -1,18 +1,141 @@
+import redis
+import logging
 from celery import Celery
-from src.app.mail import mail, create_message
-from asgiref.sync import async_to_sync
+from celery.signals import worker_process_init, worker_process_shutdown
+from src.app.mail_delivery import mail_engine, build_message, is_transient
+from src.app.email_templates import email_templates
+from src.config import Config
 
 app = Celery()
 
 app.config_from_object("src.config")
 
-@app.task()
-def send_email(recipients:list[str], subject: str, body: str):
-    message = create_message(
+OUTBOX_SENT_PREFIX = "outbox_sent:"
+OUTBOX_SENDING = b"sending"
+OUTBOX_SENT = b"sent"
+
+redis_client = redis.Redis.from_url(Config.REDIS_URL)
+
+
+@worker_process_init.connect
+def start_mail_engine(**kwargs):
+    # each prefork child gets its own loop thread and SMTP pool; solo/thread pools start it lazily on first send
+    email_templates.load()
+    mail_engine.start()
+
+@worker_process_shutdown.connect
+def stop_mail_engine(**kwargs):
+    mail_engine.stop()
+
+
+class TransientDeliveryError(Exception):
+    """Delivery failed in a way worth retrying later (connection trouble, 4xx replies)"""
+
+
+@app.task(
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    autoretry_for=(TransientDeliveryError,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=Config.MAIL_TASK_MAX_RETRIES
+)
+def send_email(self, recipients:list[str], subject: str, body: str = None, template: str = None, context: dict = None, outbox_uid: str = None):
+    """
+    Send body as is, or render one of the compiled email templates with context.
+
+    The outbox row is gone once the relay has published it, so this task is what
+    must not lose the email: transient failures are retried by Celery with backoff,
+    and a worker dying mid-send requeues the task (acks_late + reject_on_worker_lost).
+    A relay crash can publish the same row twice, so the uid is claimed in Redis:
+    "sent" means done, "sending" means another attempt holds it, and the task comes
+    back once that claim expires, which also covers an attempt that died.
+    """
+    # rendered before claiming, so a bad template or context never leaves a claim behind
+    if template is not None:
+        body = email_templates.render(template, context or {})
+
+    message = build_message(
         recipients=recipients,
         subject=subject,
         body=body
     )
 
-    async_to_sync(mail.send_message)(message)
-    print("Message sent successfully!")
\ No newline at end of file
+    sent_key = f"{OUTBOX_SENT_PREFIX}{outbox_uid}"
+
+    if outbox_uid is not None and not redis_client.set(sent_key, OUTBOX_SENDING, nx=True, ex=Config.OUTBOX_CLAIM_TTL):
+        state = redis_client.get(sent_key)
+
+        if state == OUTBOX_SENT:
+            logging.info(f"Outbox message {outbox_uid} already sent, skipping")
+            return
+
+        if state is not None:
+            claim_ttl = redis_client.ttl(sent_key)
+            logging.info(f"Outbox message {outbox_uid} is claimed by another attempt, retrying in {claim_ttl}s")
+            raise self.retry(countdown=max(claim_ttl, 1) + 1, max_retries=None)
+
+        # the claim expired between SET and GET: go round again
+        raise self.retry(countdown=1, max_retries=None)
+
+    try:
+        mail_engine.send(message)
+    except Exception as e:
+        if outbox_uid is not None:
+            redis_client.delete(sent_key)
+
+        if is_transient(e):
+            raise TransientDeliveryError(str(e)) from e
+        raise
+
+    if outbox_uid is not None:
+        redis_client.set(sent_key, OUTBOX_SENT, ex=Config.OUTBOX_DEDUP_TTL)
+
+    logging.info(f"Email sent to {', '.join(recipients)}")
+
+@app.task()
+def send_bulk_email(messages: list[dict]):
+    """
+    Deliver many {recipients, subject, body} or {recipients, subject, template, context}
+    messages over the pooled connections in one task, rendering templated ones in batch.
+    Entries that are malformed or fail to render are reported as failed without
+    holding up the rest of the batch.
+    """
+    failed = []
+    valid = []
+
+    for index, message in enumerate(messages):
+        if not message.get("recipients") or not message.get("subject") or (message.get("body") is None) == (message.get("template") is None):
+            logging.error(f"Bulk email entry {index} needs recipients, a subject and exactly one of body or template")
+            failed.append(index)
+        else:
+            valid.append(index)
+
+    bodies = []
+
+    try:
+        bodies = email_templates.render_batch([messages[index] for index in valid])
+    except Exception as e:
+        # fall back to rendering one by one so a single bad context only fails its own entry
+        logging.warning(f"Bulk email batch failed to render ({e}), rendering entries individually")
+
+        for index in valid:
+            try:
+                bodies.extend(email_templates.render_batch([messages[index]]))
+            except Exception as e:
+                logging.error(f"Bulk email entry {index} failed to render: {e}")
+                bodies.append(None)
+
+    outgoing = [(index, body) for index, body in zip(valid, bodies) if body is not None]
+    failed.extend(index for index, body in zip(valid, bodies) if body is None)
+
+    errors = mail_engine.send_many([
+        build_message(recipients=messages[index]["recipients"], subject=messages[index]["subject"], body=body)
+        for index, body in outgoing
+    ])
+
+    failed.extend(index for (index, _), error in zip(outgoing, errors) if error is not None)
+
+    return {"sent": len(messages) - len(failed), "failed": sorted(failed)}
\ No newline at end of file
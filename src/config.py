@@ -4,9 +4,33 @@ from pydantic import EmailStr
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_SLOW_QUERY_MS: int = 500
+    DB_SLOW_QUERY_EXPLAIN: bool = True
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_INTERVAL: int = 10
+    DB_REPLICA_HEALTH_TIMEOUT: float = 2.0
     JWT_SECRET: str
     JWT_ALGORITHM: str
     REDIS_URL: str = "redis://localhost:6379/0"
+    JOB_CACHE_TTL: int = 300
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 60
+    STATELESS_AUTHZ: bool = True
+    AUTHZ_CACHE_SIZE: int = 100000
+    AUTHZ_CACHE_TTL: int = 60
+    BULK_JOB_MAX_ROWS: int = 1000
+    BULK_JOB_MAX_BYTES: int = 4194304
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE: int = 64
+    BLOCKLIST_FILTER_CAPACITY: int = 100000
+    BLOCKLIST_FILTER_ERROR_RATE: float = 0.001
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     MAIL_PORT: int = 587
@@ -17,7 +41,20 @@ class Settings(BaseSettings):
     MAIL_FROM_NAME: Optional[str] = None
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    MAIL_TIMEOUT: int = 30
+    MAIL_POOL_SIZE: int = 2
+    MAIL_BATCH_SIZE: int = 50
+    MAIL_MAX_RETRIES: int = 3
+    MAIL_RETRY_BACKOFF: float = 1.0
+    MAIL_TASK_MAX_RETRIES: int = 8
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_CLAIM_TTL: int = 600
+    OUTBOX_DEDUP_TTL: int = 604800
+    OUTBOX_METRICS_PORT: int = 9101
     DOMAIN: str
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+    ACCESS_LOG_SLOW_MS: int = 1000
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,28 +1,222 @@
-from sqlmodel import create_engine, SQLModel
-from sqlalchemy.ext.asyncio import AsyncEngine
+import time
+import asyncio
+import logging
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
 from src.config import Config
 
-async_engine = AsyncEngine(
-    create_engine(
-        url=Config.DATABASE_URL)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that also records how long callers wait for a connection"""
+
+    wait_count = 0
+    wait_time_total = 0.0
+    wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+
+SLOW_QUERY_EXPLAIN_INTERVAL = 60
+
+
+class QueryStats:
+    """Queries run and time spent in the database on behalf of one request"""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+# set per request by the RequestInstrumentation middleware; the object is mutated in place so
+# queries run in child tasks and SQLAlchemy's greenlets are counted against the request
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+_explained_at: dict[str, float] = {}
+_explain_tasks: set[asyncio.Task] = set()
+
+
+async def explain_slow_query(engine: AsyncEngine, statement: str, parameters, elapsed: float) -> None:
+    query_stats.set(None)
+    plan = "not explained"
+
+    if Config.DB_SLOW_QUERY_EXPLAIN and parameters is not None:
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+        except (SQLAlchemyError, OSError) as e:
+            plan = f"EXPLAIN failed: {e}"
+
+    logging.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}\n{plan}")
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Time every statement on the engine, add it to the current request's QueryStats,
+    and log statements slower than DB_SLOW_QUERY_MS with their plan. The EXPLAIN runs
+    in a background task, at most once per statement every SLOW_QUERY_EXPLAIN_INTERVAL.
+    """
+
+    # the start time lives on the execution context, so a statement that fails (and never
+    # reaches after_cursor_execute) leaves nothing behind on the pooled connection
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        stats = query_stats.get()
+
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+        if not Config.DB_SLOW_QUERY_MS or elapsed * 1000 < Config.DB_SLOW_QUERY_MS or statement.startswith("EXPLAIN"):
+            return
+
+        now = time.monotonic()
+
+        if now - _explained_at.get(statement, 0) < SLOW_QUERY_EXPLAIN_INTERVAL:
+            return
+
+        if len(_explained_at) > 1000:
+            _explained_at.clear()
+
+        _explained_at[statement] = now
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logging.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}")
+            return
+
+        task = loop.create_task(explain_slow_query(engine, statement, None if executemany else parameters, elapsed))
+        _explain_tasks.add(task)
+        task.add_done_callback(_explain_tasks.discard)
+
+
+def build_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+        connect_args={
+            "server_settings": {"statement_timeout": str(Config.DB_STATEMENT_TIMEOUT_MS)},
+            "prepared_statement_cache_size": Config.DB_PREPARED_STATEMENT_CACHE_SIZE
+        }
+    )
+
+    instrument_engine(engine)
+
+    return engine
+
+async_engine = build_engine(Config.DATABASE_URL)
+
+async_session_maker = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
 )
 
-async def init_db() -> None:
-    async with async_engine.begin() as conn:
-        from src.app.models import User
 
-        await conn.run_sync(SQLModel.metadata.create_all)
+class ReplicaRouter:
+    """
+    Round-robins read-only sessions over the replicas that passed their last health
+    check, and falls back to the primary when none are available.
+    """
+
+    def __init__(self, urls: list[str]) -> None:
+        self.engines = [build_engine(url) for url in urls]
+        self.healthy = list(self.engines)
+        self._next = 0
+
+    def pick(self) -> AsyncEngine:
+        healthy = self.healthy
+
+        if not healthy:
+            return async_engine
+
+        engine = healthy[self._next % len(healthy)]
+        self._next += 1
+
+        return engine
+
+    async def check_health(self) -> None:
+        healthy = []
+
+        for engine in self.engines:
+            try:
+                await asyncio.wait_for(self._ping(engine), timeout=Config.DB_REPLICA_HEALTH_TIMEOUT)
+                healthy.append(engine)
+            except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+                logging.warning(f"Read replica {engine.url} failed its health check: {e}")
+
+        self.healthy = healthy
+
+    async def monitor(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(Config.DB_REPLICA_HEALTH_INTERVAL)
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _ping(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+
+replicas = ReplicaRouter([url.strip() for url in Config.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+
+async def init_db() -> None:
+    # the schema is owned by the Alembic migrations (alembic upgrade head); only check connectivity here
+    async with async_engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
     
 
 async def get_session():
-    
-    Session = sessionmaker(
-        bind=async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
 
-    async with Session() as session:
-        yield session
\ No newline at end of file
+    async with async_session_maker() as session:
+        yield session
+
+def read_session_scope() -> AsyncSession:
+    """Session on a replica (or the primary) for read-only work; never use it for writes"""
+
+    return async_session_maker(bind=replicas.pick())
+
+async def get_read_session():
+
+    async with read_session_scope() as session:
+        yield session
+
+
+def pool_stats(engine: AsyncEngine = async_engine) -> dict:
+    pool = engine.pool
+
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "wait_count": pool.wait_count,
+        "wait_time_total_seconds": pool.wait_time_total,
+        "wait_time_max_seconds": pool.wait_time_max
+    }
\ No newline at end of file
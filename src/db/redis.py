@@ -1,15 +1,273 @@
+import math
+import time
+import asyncio
+import logging
+from collections import OrderedDict
 import redis.asyncio as redis
+from redis.exceptions import RedisError
 from src.config import Config
+from src.db.bloom import BloomFilter
+from src.app.metrics import redis_command_duration_seconds
 
 JTI_EXPIRY = 3600
-token_blocklist = redis.from_url(Config.REDIS_URL)
+BLOCKLIST_PREFIX = "blocklist:"
+BLOCKLIST_CHANNEL = "token_blocklist:revoked"
+BLOCKLIST_RESYNC_DELAY = 5
+JOB_CACHE_PREFIX = "job:"
+AUTHZ_VERSION_PREFIX = "authz_version:"
+AUTHZ_VERSION_CHANNEL = "authz_version:bumped"
+# tokens revoked before blocklist keys were prefixed are stored under the bare JTI (a uuid4);
+# they keep being honoured until the last of them can have expired
+LEGACY_BLOCKLIST_PATTERN = "????????-????-????-????-????????????"
+LEGACY_BLOCKLIST_UNTIL = time.time() + JTI_EXPIRY
 
-async def add_token_to_blocklist(jti: str) -> None:
-    
-    await token_blocklist.set(name=jti, value="", ex=JTI_EXPIRY)
+
+class TimedRedis(redis.Redis):
+    """Redis client that records the round trip of every command it executes"""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_duration_seconds.observe(time.perf_counter() - start, args[0])
+
+
+redis_client = TimedRedis.from_url(Config.REDIS_URL)
+
+job_cache_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+class RevokedTokenFilter:
+    """
+    In-process bloom filter of revoked JTIs, kept in sync over Redis pub/sub.
+    While it is not ready (startup, resync, lost subscription) every lookup goes to Redis.
+    """
+
+    def __init__(self) -> None:
+        self.bloom: BloomFilter | None = None
+        self.ready = False
+        self.local_answers = 0
+        self.redis_lookups = 0
+
+    def add(self, jti: str) -> None:
+        if self.bloom is not None:
+            self.bloom.add(jti)
+
+    def might_contain(self, jti: str) -> bool:
+        if not self.ready:
+            return True
+
+        return jti in self.bloom
+
+
+revoked_tokens = RevokedTokenFilter()
+
+
+class AuthzVersionCache:
+    """
+    Per-process LRU of users' authz versions, so RoleChecker answers from memory.
+    Bumps are published on AUTHZ_VERSION_CHANNEL and applied by the same subscription
+    that feeds the revoked token filter. While that subscription is down nothing is
+    served or stored here and every lookup goes to Redis. Versions only grow, so a
+    lookup racing a bump can never overwrite the newer value. Entries still expire
+    after ttl seconds, bounding staleness if a bump's publish was lost.
+    """
+
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.ready = False
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._versions: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def get(self, user_uid: str) -> int | None:
+        if not self.ready:
+            return None
+
+        entry = self._versions.get(user_uid)
+
+        if entry is None or entry[1] <= time.monotonic():
+            self._versions.pop(user_uid, None)
+            self.misses += 1
+            return None
+
+        version = entry[0]
+        self._versions.move_to_end(user_uid)
+        self.hits += 1
+
+        return version
+
+    def put(self, user_uid: str, version: int, generation: int | None = None) -> None:
+        # a lookup that started before a resubscribe may have missed a bump; drop it
+        if not self.ready or (generation is not None and generation != self.generation):
+            return
+
+        current = self._versions.get(user_uid)
+
+        if current is not None and current[0] > version:
+            version = current[0]
+
+        self._versions[user_uid] = (version, time.monotonic() + self.ttl)
+        self._versions.move_to_end(user_uid)
+
+        while len(self._versions) > self.max_size:
+            self._versions.popitem(last=False)
+
+    def reset(self, ready: bool) -> None:
+        self._versions.clear()
+        self.generation += 1
+        self.ready = ready
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+authz_versions = AuthzVersionCache(max_size=Config.AUTHZ_CACHE_SIZE, ttl=Config.AUTHZ_CACHE_TTL)
+
+
+async def add_token_to_blocklist(jti: str, exp: float | None = None) -> None:
+    # the entry only needs to live as long as the token itself
+    expiry = JTI_EXPIRY if exp is None else max(1, math.ceil(exp - time.time()))
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.set(name=f"{BLOCKLIST_PREFIX}{jti}", value="", ex=expiry)
+        pipe.publish(BLOCKLIST_CHANNEL, jti)
+
+        # pipelines bypass execute_command, so time the batch as a whole
+        with redis_command_duration_seconds.time("PIPELINE"):
+            await pipe.execute()
+
+    revoked_tokens.add(jti)
 
 async def token_in_blocklist(jti: str) -> bool:
+
+    if not revoked_tokens.might_contain(jti):
+        revoked_tokens.local_answers += 1
+        return False
     
-    jti = await token_blocklist.get(jti)
+    revoked_tokens.redis_lookups += 1
+    keys = [f"{BLOCKLIST_PREFIX}{jti}"]
+
+    if time.time() < LEGACY_BLOCKLIST_UNTIL:
+        keys.append(jti)
+
+    return await redis_client.exists(*keys) > 0
+
+async def sync_revoked_tokens() -> None:
+    """
+    Long-running task: subscribe to revocations, load the live blocklist into a fresh
+    filter, then apply published JTIs. Subscribing before the scan means nothing revoked
+    in between is missed. The filter is rebuilt once it outgrows its capacity, which
+    also drops JTIs whose Redis entries have expired. The same subscription carries
+    authz version bumps for AuthzVersionCache, which starts empty on every resubscribe.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+
+        try:
+            await pubsub.subscribe(BLOCKLIST_CHANNEL, AUTHZ_VERSION_CHANNEL)
+            authz_versions.reset(ready=True)
+
+            bloom = BloomFilter(Config.BLOCKLIST_FILTER_CAPACITY, Config.BLOCKLIST_FILTER_ERROR_RATE)
+
+            async for key in redis_client.scan_iter(match=f"{BLOCKLIST_PREFIX}*", count=1000):
+                bloom.add(key.decode()[len(BLOCKLIST_PREFIX):])
+
+            if time.time() < LEGACY_BLOCKLIST_UNTIL:
+                async for key in redis_client.scan_iter(match=LEGACY_BLOCKLIST_PATTERN, count=1000):
+                    bloom.add(key.decode())
+
+            revoked_tokens.bloom = bloom
+            revoked_tokens.ready = True
+
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                try:
+                    if message["channel"].decode() == AUTHZ_VERSION_CHANNEL:
+                        user_uid, version = message["data"].decode().rsplit(":", 1)
+                        authz_versions.put(user_uid, int(version))
+                        continue
+
+                    bloom.add(message["data"].decode())
+                except ValueError:
+                    logging.warning(f"Ignoring malformed message on {message['channel']!r}: {message['data']!r}")
+                    continue
+
+                if bloom.count > bloom.capacity:
+                    logging.info("Revoked token filter is full, rebuilding")
+                    break
+        except RedisError as e:
+            logging.warning(f"Revoked token filter lost its subscription: {e}")
+            await asyncio.sleep(BLOCKLIST_RESYNC_DELAY)
+        except Exception:
+            # anything else would end the task and leave the filter off for good; resubscribe instead
+            logging.exception("Revoked token filter sync failed, resubscribing")
+            await asyncio.sleep(BLOCKLIST_RESYNC_DELAY)
+        finally:
+            revoked_tokens.ready = False
+            authz_versions.reset(ready=False)
+            await pubsub.reset()
+
+async def get_authz_version(user_uid: str) -> int | None:
+    """Current authorization version for a user, or None when Redis cannot answer"""
+    version = authz_versions.get(user_uid)
+
+    if version is not None:
+        return version
+
+    generation = authz_versions.generation
+
+    try:
+        version = await redis_client.get(f"{AUTHZ_VERSION_PREFIX}{user_uid}")
+    except RedisError as e:
+        logging.warning(f"Authz version lookup failed: {e}")
+        return None
+
+    version = int(version) if version is not None else 0
+    authz_versions.put(user_uid, version, generation)
+
+    return version
+
+async def bump_authz_version(user_uid: str) -> None:
+    """Invalidate the role/verification claims of every token issued to this user"""
+    try:
+        version = await redis_client.incr(f"{AUTHZ_VERSION_PREFIX}{user_uid}")
+        authz_versions.put(user_uid, version)
+        await redis_client.publish(AUTHZ_VERSION_CHANNEL, f"{user_uid}:{version}")
+    except RedisError as e:
+        logging.error(f"Authz version bump failed for {user_uid}: {e}")
+
+async def get_cached_job(job_uid: str) -> bytes | None:
+    """Cached job row JSON, or None on a miss or when Redis is unavailable"""
+    try:
+        payload = await redis_client.get(f"{JOB_CACHE_PREFIX}{job_uid}")
+    except RedisError as e:
+        job_cache_stats["errors"] += 1
+        logging.warning(f"Job cache read failed: {e}")
+        return None
+
+    job_cache_stats["hits" if payload is not None else "misses"] += 1
+
+    return payload
+
+async def cache_job(job_uid: str, payload: str) -> None:
+    try:
+        await redis_client.set(name=f"{JOB_CACHE_PREFIX}{job_uid}", value=payload, ex=Config.JOB_CACHE_TTL)
+    except RedisError as e:
+        job_cache_stats["errors"] += 1
+        logging.warning(f"Job cache write failed: {e}")
+
+async def invalidate_job(*job_uids: str) -> None:
+    if not job_uids:
+        return
 
-    return jti is not None
\ No newline at end of file
+    try:
+        await redis_client.delete(*(f"{JOB_CACHE_PREFIX}{job_uid}" for job_uid in job_uids))
+    except RedisError as e:
+        job_cache_stats["errors"] += 1
+        logging.error(f"Job cache invalidation failed: {e}")
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Publishes outbox rows to Celery. Run alongside the API and the worker:
+
+    python -m src.outbox_relay
+
+Each batch is locked with FOR UPDATE SKIP LOCKED, published, then deleted in the
+same transaction. A crash after publishing leaves the rows to be published again,
+and send_email drops the duplicates by outbox uid.
+
+Publish timings are served in the Prometheus format on OUTBOX_METRICS_PORT (0 disables).
+"""
+import time
+import asyncio
+import logging
+from src.db.main import async_session_maker, async_engine
+from src.app.services import outbox_service
+from src.celery_tasks import app as celery_app
+from src.app.metrics import registry, serve_metrics, celery_publish_duration_seconds, celery_publish_errors_total
+from src.config import Config
+
+
+outbox_relayed_total = registry.counter("outbox_relayed_total", "Outbox rows published and removed")
+outbox_relay_batch_seconds = registry.histogram("outbox_relay_batch_seconds", "Claim, publish and delete of one outbox batch")
+
+
+def publish(messages) -> None:
+    with celery_app.producer_or_acquire() as producer:
+        for message in messages:
+            try:
+                with celery_publish_duration_seconds.time(message.task):
+                    celery_app.send_task(
+                        message.task,
+                        kwargs={**message.payload, "outbox_uid": str(message.uid)},
+                        task_id=str(message.uid),
+                        producer=producer
+                    )
+            except Exception:
+                celery_publish_errors_total.inc(message.task)
+                raise
+
+async def relay_batch() -> int:
+    start = time.perf_counter()
+
+    async with async_session_maker() as session:
+        messages = await outbox_service.claim_batch(session, Config.OUTBOX_BATCH_SIZE)
+
+        if not messages:
+            return 0
+
+        # kombu publishes are blocking; keep them off the event loop
+        await asyncio.to_thread(publish, messages)
+
+        await outbox_service.delete_batch(session, [message.uid for message in messages])
+        await session.commit()
+
+    outbox_relayed_total.inc(amount=len(messages))
+    outbox_relay_batch_seconds.observe(time.perf_counter() - start)
+
+    return len(messages)
+
+async def run() -> None:
+    while True:
+        try:
+            relayed = await relay_batch()
+        except Exception as e:
+            # broker or database unavailable: the rows stay in the outbox for the next pass
+            logging.error(f"Outbox relay failed: {e}")
+            relayed = 0
+
+        if relayed:
+            logging.info(f"Relayed {relayed} outbox messages")
+
+        if relayed < Config.OUTBOX_BATCH_SIZE:
+            await asyncio.sleep(Config.OUTBOX_POLL_INTERVAL)
+
+async def main() -> None:
+    metrics_server = asyncio.create_task(serve_metrics(Config.OUTBOX_METRICS_PORT)) if Config.OUTBOX_METRICS_PORT else None
+
+    try:
+        await run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.cancel()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+# the suite truncates every table, so it only ever runs against its own database;
+# tests that need Postgres are skipped when TEST_DATABASE_URL is not set. Redis is
+# read from REDIS_URL as usual and only job cache and authz version keys are touched.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://localhost/jobberman_test"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+# no background EXPLAINs of slow statements while queries are being counted
+os.environ["DB_SLOW_QUERY_MS"] = "0"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("MAIL_USERNAME", "test")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+os.environ.setdefault("MAIL_FROM", "noreply@example.com")
+os.environ.setdefault("DOMAIN", "localhost:8000")
+
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from httpx import AsyncClient, ASGITransport
+from src import app
+from src.app.models import User, Job, Application
+from src.app.auth.auth import build_user_claims
+from src.app.auth.utils import create_access_token, hash_password
+from src.db.main import async_engine, async_session_maker
+from src.db.redis import bump_authz_version
+
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = "password123"
+PASSWORD_HASH = hash_password(PASSWORD)
+
+JOBS_PER_EMPLOYER = 30
+SEEKERS = 10
+APPLIED_JOBS = 5
+
+
+def build_user(role: str) -> User:
+    suffix = uuid4().hex[:12]
+
+    return User(
+        username=f"{role}_{suffix}",
+        email_address=f"{role}_{suffix}@example.com",
+        first_name="Test",
+        last_name=role.title(),
+        hashed_password=PASSWORD_HASH,
+        phone_number="08000000000",
+        gender="other",
+        is_verified=True,
+        role=role
+    )
+
+def build_job(employer: User, index: int) -> Job:
+    return Job(
+        title=f"Backend engineer {index}",
+        description=f"Python and Postgres engineer for listing {index}, working on search and payments.",
+        location="Lagos",
+        salary="100000",
+        is_active=True,
+        employer_uid=employer.uid
+    )
+
+async def issue_token(user: User) -> str:
+    """
+    Access token carrying the user's current authz_version, so role checks are answered
+    from the token and requests only run the queries of the endpoint itself.
+    """
+    await bump_authz_version(str(user.uid))
+
+    return create_access_token(user_data=await build_user_claims(user), expiry=timedelta(hours=1))
+
+
+@pytest.fixture(scope="session")
+def database():
+    if TEST_DATABASE_URL is None:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    alembic_config = AlembicConfig(str(ROOT / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.upgrade(alembic_config, "head")
+
+    return TEST_DATABASE_URL
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def engine(database):
+    async with async_engine.begin() as conn:
+        await conn.exec_driver_sql("TRUNCATE users, jobs, applications, outbox CASCADE")
+
+    yield async_engine
+
+    await async_engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def seeded(engine):
+    """Two employers with JOBS_PER_EMPLOYER jobs each and SEEKERS job seekers who applied to APPLIED_JOBS of them"""
+    employer = build_user("employer")
+    other_employer = build_user("employer")
+    seekers = [build_user("user") for _ in range(SEEKERS)]
+    jobs = [build_job(employer, index) for index in range(JOBS_PER_EMPLOYER)]
+    other_jobs = [build_job(other_employer, index) for index in range(JOBS_PER_EMPLOYER)]
+    applications = [
+        Application(job_uid=job.uid, user_uid=seeker.uid, cover_letter=f"Cover letter from {seeker.username}")
+        for job in jobs[:APPLIED_JOBS]
+        for seeker in seekers
+    ]
+
+    async with async_session_maker() as session:
+        session.add_all([employer, other_employer, *seekers])
+        await session.flush()
+        session.add_all([*jobs, *other_jobs])
+        await session.flush()
+        session.add_all(applications)
+        await session.commit()
+
+    return SimpleNamespace(
+        employer=employer,
+        other_employer=other_employer,
+        seeker=seekers[0],
+        jobs=jobs,
+        other_jobs=other_jobs,
+        employer_token=await issue_token(employer),
+        other_employer_token=await issue_token(other_employer),
+        seeker_token=await issue_token(seekers[0])
+    )
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def client(engine):
+    # ASGITransport does not run the lifespan, so the app's background tasks stay off
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://localhost") as client:
+        yield client
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+SQL statements per request. Relationships are lazy="raise" and listings select columns,
+so every endpoint here runs a fixed number of queries however many rows it returns;
+a regression shows up as a 500 (an implicit load hitting raiseload) or a higher count (N+1).
+"""
+import re
+import pytest
+from sqlalchemy import event
+from src.db.main import async_engine
+from src.db.redis import invalidate_job
+from tests.conftest import JOBS_PER_EMPLOYER, SEEKERS, APPLIED_JOBS
+
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+API = "/api/v1.0"
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+@pytest.fixture
+def statements():
+    """Every statement sent through the engine while the test runs"""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+async def count_queries(client, statements, token, method, url, **kwargs):
+    statements.clear()
+
+    response = await client.request(method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+    assert response.status_code < 300, response.text
+
+    # Server-Timing is fed by the engine's own hooks through the request's QueryStats
+    reported = SERVER_TIMING_QUERIES.search(response.headers["Server-Timing"])
+    assert int(reported.group(1)) == len(statements), statements
+
+    return response, len(statements)
+
+
+async def test_job_listing_is_one_query_per_page(client, seeded, statements):
+    response, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/jobs", params={"limit": 10})
+    assert count == 1
+
+    next_cursor = response.json()["next_cursor"]
+    assert next_cursor is not None
+
+    _, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/jobs", params={"limit": 10, "cursor": next_cursor})
+    assert count == 1
+
+
+async def test_job_search_is_one_query(client, seeded, statements):
+    response, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/jobs/search", params={"q": "postgres engineer"})
+
+    assert count == 1
+    assert response.json()["items"]
+
+
+async def test_job_details_are_served_from_cache(client, seeded, statements):
+    job_uid = str(seeded.jobs[0].uid)
+    await invalidate_job(job_uid)
+
+    _, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/jobs/{job_uid}")
+    assert count == 1
+
+    _, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/jobs/{job_uid}")
+    assert count == 0
+
+
+async def test_job_details_with_applications(client, seeded, statements):
+    job_uid = str(seeded.jobs[0].uid)
+    await invalidate_job(job_uid)
+
+    response, count = await count_queries(
+        client, statements, seeded.employer_token, "GET", f"{API}/jobs/{job_uid}", params={"include": "applications"}
+    )
+
+    assert count == 2
+    assert len(response.json()["applications"]["items"]) == SEEKERS
+
+
+@pytest.mark.parametrize("who", ["employer", "seeker"])
+async def test_user_details_load_relationships_in_fixed_queries(client, seeded, statements, who):
+    user = getattr(seeded, who)
+
+    response, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/users/{user.uid}")
+
+    # the user, then one selectinload each for jobs and applications
+    assert count == 3
+    assert len(response.json()["job"]) == (JOBS_PER_EMPLOYER if who == "employer" else 0)
+    assert len(response.json()["application"]) == (APPLIED_JOBS if who == "seeker" else 0)
+
+
+async def test_user_listing_is_one_query(client, seeded, statements):
+    _, count = await count_queries(client, statements, seeded.seeker_token, "GET", f"{API}/users", params={"role": "user"})
+
+    assert count == 1
+
+
+async def test_employer_jobs_is_one_query(client, seeded, statements):
+    response, count = await count_queries(
+        client, statements, seeded.employer_token, "GET", f"{API}/jobs/employer_listed_jobs/{seeded.employer.uid}"
+    )
+
+    assert count == 1
+    assert len(response.json()) == JOBS_PER_EMPLOYER
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/applications", 1),
+    ("/applications/list", 1),
+    # the job is looked up first so a missing one is a 404 rather than an empty page
+    ("/applications/list/{job_uid}", 2),
+])
+async def test_application_listings(client, seeded, statements, path, expected):
+    url = API + path.format(job_uid=seeded.jobs[0].uid)
+
+    _, count = await count_queries(client, statements, seeded.seeker_token, "GET", url)
+
+    assert count == expected
+
+
+async def test_bulk_job_insert_is_one_statement(client, seeded, statements):
+    rows = [
+        {"title": f"Bulk listing {index}", "description": "Posted in bulk", "location": "Abuja", "salary": "90000"}
+        for index in range(50)
+    ]
+
+    response, count = await count_queries(client, statements, seeded.other_employer_token, "POST", f"{API}/jobs/bulk", json=rows)
+
+    assert count == 1
+    assert response.json()["created"] == 50
+
+    uids = [result["uid"] for result in response.json()["results"]]
+
+    _, count = await count_queries(client, statements, seeded.other_employer_token, "POST", f"{API}/jobs/bulk-delete", json={"uids": uids})
+
+    assert count == 1
+
+
+async def test_job_update_is_one_statement(client, seeded, statements):
+    job = seeded.other_jobs[0]
+    payload = {"title": job.title, "description": job.description, "location": job.location, "salary": "120000", "is_active": True}
+
+    response, count = await count_queries(client, statements, seeded.other_employer_token, "PUT", f"{API}/jobs/{job.uid}", json=payload)
+
+    assert count == 1
+    assert response.json()["salary"] == "120000"
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+EXPLAIN the statements the services actually send, against a database seeded to a
+realistic size and ANALYZEd, and check each lookup and listing is served by the index
+that was added for it. A predicate or ORDER BY that stops matching its index (a plain
+email comparison, an extra sort key) fails here instead of as a sequential scan in production.
+"""
+import json
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from sqlalchemy import event
+from src.app.services import user_service, job_service, application_service
+from src.app.pagination import ListParams, encode_cursor
+from src.db.main import async_engine, async_session_maker
+
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+PLAN_USERS = 20000
+PLAN_EMPLOYERS = 200
+PLAN_JOBS = 20000
+PLAN_APPLICATIONS = 40000
+# one job in every SEARCH_TERM_EVERY mentions the search term
+SEARCH_TERM_EVERY = 500
+
+SEED_USERS = f"""
+INSERT INTO users (uid, username, email_address, first_name, last_name, hashed_password, phone_number, gender, is_verified, role, created_at, updated_at, version)
+SELECT gen_random_uuid(), 'plan_user_' || n, 'Plan.User' || n || '@Example.com', 'Plan', 'User', 'not-a-hash', '08000000000', 'other', true,
+       CASE WHEN n <= {PLAN_EMPLOYERS} THEN 'employer' ELSE 'user' END,
+       now() - n * interval '1 minute', now(), 1
+FROM generate_series(1, {PLAN_USERS}) AS n
+"""
+
+SEED_JOBS = f"""
+INSERT INTO jobs (uid, title, description, location, salary, is_active, employer_uid, created_at)
+SELECT gen_random_uuid(), 'Plan listing ' || n,
+       CASE WHEN n % {SEARCH_TERM_EVERY} = 0 THEN 'Kubernetes platform engineer, on call one week in six' ELSE 'General role, listing number ' || n END,
+       'Lagos', '100000', true, employers.uid, now() - n * interval '1 minute'
+FROM generate_series(1, {PLAN_JOBS}) AS n
+JOIN (
+    SELECT uid, row_number() OVER (ORDER BY username) - 1 AS slot FROM users WHERE username LIKE 'plan_user_%' AND role = 'employer'
+) AS employers ON employers.slot = n % {PLAN_EMPLOYERS}
+"""
+
+SEED_APPLICATIONS = f"""
+INSERT INTO applications (uid, job_uid, user_uid, cover_letter, created_at)
+SELECT gen_random_uuid(), jobs.uid, seekers.uid, 'Cover letter ' || n, now() - n * interval '30 seconds'
+FROM generate_series(1, {PLAN_APPLICATIONS}) AS n
+JOIN (
+    SELECT uid, row_number() OVER (ORDER BY uid) - 1 AS slot FROM users WHERE username LIKE 'plan_user_%' AND role = 'user'
+) AS seekers ON seekers.slot = n % {PLAN_USERS - PLAN_EMPLOYERS}
+JOIN (
+    SELECT uid, row_number() OVER (ORDER BY uid) - 1 AS slot FROM jobs WHERE title LIKE 'Plan listing %'
+) AS jobs ON jobs.slot = n % {PLAN_JOBS}
+"""
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def plan_data(engine):
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(SEED_USERS)
+        await conn.exec_driver_sql(SEED_JOBS)
+        await conn.exec_driver_sql(SEED_APPLICATIONS)
+
+    # ANALYZE cannot run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("ANALYZE users, jobs, applications")
+
+        employer = (await conn.exec_driver_sql(
+            "SELECT uid, email_address FROM users WHERE username = 'plan_user_1'"
+        )).one()
+        job = (await conn.exec_driver_sql(
+            "SELECT uid, created_at FROM jobs WHERE title = 'Plan listing 100'"
+        )).one()
+        seeker_uid = (await conn.exec_driver_sql(
+            "SELECT user_uid FROM applications WHERE job_uid = $1 LIMIT 1", (job.uid,)
+        )).scalar_one()
+
+    return SimpleNamespace(
+        employer_uid=employer.uid,
+        employer_email=employer.email_address,
+        job_uid=job.uid,
+        job_cursor=encode_cursor(job.created_at, job.uid),
+        seeker_uid=seeker_uid
+    )
+
+
+async def explain(call) -> list[dict]:
+    """Run call(session) and return the EXPLAIN (FORMAT JSON) plan of every statement it sent, with its parameters"""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+
+    try:
+        async with async_session_maker() as session:
+            await call(session)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    plans = []
+
+    async with async_engine.connect() as conn:
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar_one()
+            plans.append(json.loads(plan) if isinstance(plan, str) else plan)
+
+    return plans
+
+def used_indexes(plan: list[dict]) -> set[str]:
+    indexes = set()
+    nodes = [plan[0]["Plan"]]
+
+    while nodes:
+        node = nodes.pop()
+
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+
+        nodes.extend(node.get("Plans", []))
+
+    return indexes
+
+def list_params(cursor: str = None) -> ListParams:
+    return ListParams(limit=20, cursor=cursor, created_after=None, created_before=None)
+
+
+async def test_email_lookup_uses_lower_email_index(plan_data):
+    # login and the role-check fallback look users up case-insensitively
+    plan, = await explain(lambda session: user_service.get_user_by_email(plan_data.employer_email.upper(), session))
+
+    assert "uq_users_email_address_lower" in used_indexes(plan)
+
+
+@pytest.mark.parametrize("first_page", [True, False])
+async def test_job_listing_uses_keyset_index(plan_data, first_page):
+    params = list_params(None if first_page else plan_data.job_cursor)
+
+    plan, = await explain(lambda session: job_service.get_all_jobs(session, params))
+
+    assert "ix_jobs_created_at_uid" in used_indexes(plan)
+
+
+async def test_user_listing_uses_keyset_index(plan_data):
+    plan, = await explain(lambda session: user_service.get_all_users(session, list_params()))
+
+    assert "ix_users_created_at_uid" in used_indexes(plan)
+
+
+async def test_employer_jobs_use_employer_index(plan_data):
+    plan, = await explain(lambda session: job_service.get_employer_jobs(str(plan_data.employer_uid), session))
+
+    assert "ix_jobs_employer_uid_created_at" in used_indexes(plan)
+
+
+@pytest.mark.parametrize("scope, index", [
+    ("all", "ix_applications_created_at_uid"),
+    ("job", "ix_applications_job_uid_created_at"),
+    ("user", "ix_applications_user_uid_created_at"),
+])
+async def test_application_listings_use_keyset_indexes(plan_data, scope, index):
+    filters = {
+        "all": {},
+        "job": {"job_uid": plan_data.job_uid},
+        "user": {"user_uid": plan_data.seeker_uid}
+    }[scope]
+
+    plan, = await explain(lambda session: application_service.get_applications(session, list_params(), **filters))
+
+    assert index in used_indexes(plan)
+
+
+async def test_search_uses_gin_index(plan_data):
+    plan, = await explain(lambda session: job_service.search_jobs("kubernetes", session, 20))
+
+    assert "ix_jobs_search_vector" in used_indexes(plan)
\ No newline at end of file